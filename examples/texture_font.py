@@ -10,30 +10,25 @@
 Texture font class
 
 '''
-import sys
 import math
 import numpy as np
 import OpenGL.GL as gl
 from freetype import *
+from freetype.atlas import Atlas
 
 
-class TextureAtlas:
+class TextureAtlas(Atlas):
     '''
-    Group multiple small data regions into a larger texture.
-
-    The algorithm is based on the article by Jukka Jylänki : "A Thousand Ways
-    to Pack the Bin - A Practical Approach to Two-Dimensional Rectangle Bin
-    Packing", February 27, 2010. More precisely, this is an implementation of
-    the Skyline Bottom-Left algorithm based on C++ sources provided by Jukka
-    Jylänki at: http://clb.demon.fi/files/RectangleBinPack/
+    A glyph atlas (see freetype.atlas) that can be uploaded as an OpenGL
+    texture.
 
     Example usage:
     --------------
 
     atlas = TextureAtlas(512,512,3)
-    region = atlas.get_region(20,20)
+    region = atlas.add(data)
     ...
-    atlas.set_region(region, data)
+    atlas.upload()
     '''
 
     def __init__(self, width=1024, height=1024, depth=1):
@@ -52,14 +47,10 @@ class TextureAtlas:
         depth : 1 or 3
             Depth of the underlying texture
         '''
-        self.width  = int(math.pow(2, int(math.log(width, 2) + 0.5)))
-        self.height = int(math.pow(2, int(math.log(height, 2) + 0.5)))
-        self.depth  = depth
-        self.nodes  = [ (0,0,self.width), ]
-        self.data   = np.zeros((self.height, self.width, self.depth),
-                               dtype=np.ubyte)
+        width  = int(math.pow(2, int(math.log(width, 2) + 0.5)))
+        height = int(math.pow(2, int(math.log(height, 2) + 0.5)))
+        Atlas.__init__(self, width, height, depth, padding=2)
         self.texid  = 0
-        self.used   = 0
 
 
 
@@ -90,142 +81,6 @@ class TextureAtlas:
                              gl.GL_RGB, gl.GL_UNSIGNED_BYTE, self.data )
 
 
-
-    def set_region(self, region, data):
-        '''
-        Set a given region width provided data.
-
-        Parameters
-        ----------
-
-        region : (int,int,int,int)
-            an allocated region (x,y,width,height)
-
-        data : numpy array
-            data to be copied into given region
-        '''
-
-        x, y, width, height = region
-        self.data[y:y+height,x:x+width, :] = data
-
-
-
-    def get_region(self, width, height):
-        '''
-        Get a free region of given size and allocate it
-
-        Parameters
-        ----------
-
-        width : int
-            Width of region to allocate
-
-        height : int
-            Height of region to allocate
-
-        Return
-        ------
-            A newly allocated region as (x,y,width,height) or (-1,-1,0,0)
-        '''
-
-        best_height = sys.maxsize
-        best_index = -1
-        best_width = sys.maxsize
-        region = 0, 0, width, height
-
-        for i in range(len(self.nodes)):
-            y = self.fit(i, width, height)
-            if y >= 0:
-                node = self.nodes[i]
-                if (y+height < best_height or
-                    (y+height == best_height and node[2] < best_width)):
-                    best_height = y+height
-                    best_index = i
-                    best_width = node[2]
-                    region = node[0], y, width, height
-
-        if best_index == -1:
-            return -1,-1,0,0
-
-        node = region[0], region[1]+height, width
-        self.nodes.insert(best_index, node)
-
-        i = best_index+1
-        while i < len(self.nodes):
-            node = self.nodes[i]
-            prev_node = self.nodes[i-1]
-            if node[0] < prev_node[0]+prev_node[2]:
-                shrink = prev_node[0]+prev_node[2] - node[0]
-                x,y,w = self.nodes[i]
-                self.nodes[i] = x+shrink, y, w-shrink
-                if self.nodes[i][2] <= 0:
-                    del self.nodes[i]
-                    i -= 1
-                else:
-                    break
-            else:
-                break
-            i += 1
-
-        self.merge()
-        self.used += width*height
-        return region
-
-
-
-    def fit(self, index, width, height):
-        '''
-        Test if region (width,height) fit into self.nodes[index]
-
-        Parameters
-        ----------
-
-        index : int
-            Index of the internal node to be tested
-
-        width : int
-            Width or the region to be tested
-
-        height : int
-            Height or the region to be tested
-
-        '''
-
-        node = self.nodes[index]
-        x,y = node[0], node[1]
-        width_left = width
-
-        if x+width > self.width:
-            return -1
-
-        i = index
-        while width_left > 0:
-            node = self.nodes[i]
-            y = max(y, node[1])
-            if y+height > self.height:
-                return -1
-            width_left -= node[2]
-            i += 1
-        return y
-
-
-
-    def merge(self):
-        '''
-        Merge nodes
-        '''
-
-        i = 0
-        while i < len(self.nodes)-1:
-            node = self.nodes[i]
-            next_node = self.nodes[i+1]
-            if node[1] == next_node[1]:
-                self.nodes[i] = node[0], node[1], node[2]+next_node[2]
-                del self.nodes[i+1]
-            else:
-                i += 1
-
-
 class TextureFont:
     '''
     A texture font gathers a set of glyph relatively to a given font filename
@@ -325,33 +180,23 @@ class TextureFont:
             top    = face.glyph.bitmap_top
             width  = face.glyph.bitmap.width
             rows   = face.glyph.bitmap.rows
-            pitch  = face.glyph.bitmap.pitch
 
-            x,y,w,h = self.atlas.get_region(width/self.depth+2, rows+2)
-            if x < 0:
-                print ('Missed !')
-                continue
-            x,y = x+1, y+1
-            w,h = w-2, h-2
-            data = []
-            for i in range(rows):
-                data.extend(bitmap.buffer[i*pitch:i*pitch+width])
-            data = np.array(data,dtype=np.ubyte).reshape(h,w,3)
+            data = bitmap.to_numpy()
             gamma = 1.5
             Z = ((data/255.0)**(gamma))
             data = (Z*255).astype(np.ubyte)
-            self.atlas.set_region((x,y,w,h), data)
+            region = self.atlas.add(data)
+            if region is None:
+                print ('Missed !')
+                continue
+            x,y,w,h = region
 
             # Build glyph
             size   = w,h
             offset = left, top
             advance= face.glyph.advance.x, face.glyph.advance.y
 
-            u0     = (x +     0.0)/float(self.atlas.width)
-            v0     = (y +     0.0)/float(self.atlas.height)
-            u1     = (x + w - 0.0)/float(self.atlas.width)
-            v1     = (y + h - 0.0)/float(self.atlas.height)
-            texcoords = (u0,v0,u1,v1)
+            texcoords = self.atlas.uv(region)
             glyph = TextureGlyph(charcode, size, offset, advance, texcoords)
             self.glyphs[charcode] = glyph
 
@@ -9,6 +9,7 @@
 import math
 import numpy as np
 from freetype import *
+from freetype.text import render_text
 import matplotlib.pyplot as plt
 
 
@@ -32,58 +33,9 @@ def make_label(text, filename, size=12, angle=0):
                          (int)(-math.sin( angle ) * 0x10000 ),
                          (int)( math.sin( angle ) * 0x10000 ),
                          (int)( math.cos( angle ) * 0x10000 ))
-    flags = FT_LOAD_RENDER
-    pen = FT_Vector(0,0)
-    FT_Set_Transform( face._FT_Face, byref(matrix), byref(pen) )
-    previous = 0
-    xmin, xmax = 0, 0
-    ymin, ymax = 0, 0
-    for c in text:
-        face.load_char(c, flags)
-        kerning = face.get_kerning(previous, c)
-        previous = c
-        bitmap = face.glyph.bitmap
-        pitch  = face.glyph.bitmap.pitch
-        width  = face.glyph.bitmap.width
-        rows   = face.glyph.bitmap.rows
-        top    = face.glyph.bitmap_top
-        left   = face.glyph.bitmap_left
-        pen.x += kerning.x
-        x0 = (pen.x >> 6) + left
-        x1 = x0 + width
-        y0 = (pen.y >> 6) - (rows - top)
-        y1 = y0 + rows
-        xmin, xmax = min(xmin, x0),  max(xmax, x1)
-        ymin, ymax = min(ymin, y0), max(ymax, y1)
-        pen.x += face.glyph.advance.x
-        pen.y += face.glyph.advance.y
-
-    L = np.zeros((ymax-ymin, xmax-xmin),dtype=np.ubyte)
-    previous = 0
-    pen.x, pen.y = 0, 0
-    for c in text:
-        face.load_char(c, flags)
-        kerning = face.get_kerning(previous, c)
-        previous = c
-        bitmap = face.glyph.bitmap
-        pitch  = face.glyph.bitmap.pitch
-        width  = face.glyph.bitmap.width
-        rows   = face.glyph.bitmap.rows
-        top    = face.glyph.bitmap_top
-        left   = face.glyph.bitmap_left
-        pen.x += kerning.x
-        x = (pen.x >> 6) - xmin + left
-        y = (pen.y >> 6) - ymin - (rows - top)
-        data = []
-        for j in range(rows):
-            data.extend(bitmap.buffer[j*pitch:j*pitch+width])
-        if len(data):
-            Z = np.array(data,dtype=np.ubyte).reshape(rows, width)
-            L[y:y+rows,x:x+width] |= Z[::-1,::1]
-        pen.x += face.glyph.advance.x
-        pen.y += face.glyph.advance.y
-
-    return L
+    face.set_transform( matrix, FT_Vector(0,0) )
+    # Rows are flipped to have upwards y, as the label is composed below
+    return render_text(face, text)[0][::-1]
 
 
 if __name__ == '__main__':
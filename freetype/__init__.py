@@ -16,7 +16,13 @@ Note: C Library will be searched using the ctypes.util.find_library. However,
       have to specify an explicit path below.
 '''
 import io
+import mmap
+import os
+import struct
 import sys
+import warnings
+import weakref
+from collections import OrderedDict
 from ctypes import *
 
 from freetype.raw import *
@@ -45,18 +51,56 @@ class _FT_Library_Wrapper(FT_Library):
         pass
     
 
-def _init_freetype():
-    global _handle
-
-    _handle = _FT_Library_Wrapper()
-    error = FT_Init_FreeType( byref(_handle) )
+def _new_library():
+    # A new FT_Library, with the default LCD filter: the global one, or one
+    # per worker thread (see freetype.parallel)
+    library = _FT_Library_Wrapper()
+    error = FT_Init_FreeType( byref(library) )
 
     if error: raise FT_Exception(error)
 
     try:
-        set_lcd_filter( FT_LCD_FILTER_DEFAULT )
+        FT_Library_SetLcdFilter( library, FT_LCD_FILTER_DEFAULT )
     except:
         pass
+    return library
+
+def _init_freetype():
+    global _handle
+
+    _handle = _new_library()
+
+# Live faces, reopened in forked children
+_faces = weakref.WeakSet()
+
+def _after_fork_in_child():
+    # A forked child gets a copy of the FreeType state of its parent, as it
+    # was at the time of the fork (possibly in the middle of a call from
+    # another thread), and faces opened from paths share their file offset
+    # with the parent. Start afresh with a new library, and reopen the faces
+    # of the global library in it; the old library and faces are left
+    # untouched (leaked), as their state cannot be trusted. A face that
+    # cannot be reopened (e.g. its file was deleted) keeps the copy of its
+    # parent's FT_Face, with a warning, and does not stop the others.
+    global _handle
+
+    if _handle is None:
+        return
+    parent, _handle = _handle, None
+    for face in list(_faces):
+        if face._library is parent and face._FT_Face is not None and \
+           face._source is not None:
+            try:
+                face._reopen()
+            except Exception as e:
+                source = face._source[1] if face._source[0] == 'path' \
+                    else face.family_name
+                warnings.warn('could not reopen face %r after fork, it is '
+                              'still shared with the parent: %s' % (source, e),
+                              RuntimeWarning)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
 # -----------------------------------------------------------------------------
 # High-level API of FreeType 2
@@ -158,6 +202,104 @@ def _encode_filename(filename):
     return encoded
 
 
+class _Py_buffer(Structure):
+    _fields_ = [('buf', c_void_p), ('obj', c_void_p), ('len', c_ssize_t),
+                ('itemsize', c_ssize_t), ('readonly', c_int), ('ndim', c_int),
+                ('format', c_char_p), ('shape', POINTER(c_ssize_t)),
+                ('strides', POINTER(c_ssize_t)),
+                ('suboffsets', POINTER(c_ssize_t)), ('internal', c_void_p)]
+
+class _BufferPin(object):
+    # Holds a read-only buffer through the buffer protocol, which ctypes
+    # cannot do, so that its address stays valid until the pin is released.
+    def __init__(self, obj):
+        self._view = _Py_buffer()
+        error = pythonapi.PyObject_GetBuffer(py_object(obj),
+                                             byref(self._view), 0)
+        if error:
+            raise BufferError('cannot get a contiguous buffer')
+        self.address = self._view.buf
+        self.size = self._view.len
+
+    def __del__(self):
+        if self._view.obj:
+            pythonapi.PyBuffer_Release(byref(self._view))
+
+def _buffer_address(buffer):
+    # Return the address and size of a buffer-protocol object, plus an
+    # object to keep alive while the address is in use. Nothing is copied,
+    # except for read-only buffers where the CPython API is not available.
+    if isinstance(buffer, bytes):
+        return buffer, len(buffer), buffer
+    try:
+        view = memoryview(buffer)
+    except TypeError:
+        # Python 2 mmaps only have the old buffer interface
+        body = buffer[:]
+        return body, len(body), body
+    if not hasattr(view, 'c_contiguous'):
+        # Python 2 cannot pin buffers against resizing, copy them
+        body = view.tobytes()
+        return body, len(body), body
+    if not view.c_contiguous:
+        raise ValueError('font data must be a contiguous buffer')
+    if isinstance(view.obj, bytes) and view.nbytes == len(view.obj):
+        return view.obj, view.nbytes, view.obj
+    if not view.readonly:
+        body = (c_char * view.nbytes).from_buffer(view)
+        return body, view.nbytes, body
+    try:
+        pin = _BufferPin(view)
+    except (AttributeError, NameError):
+        body = view.tobytes()
+        return body, len(body), body
+    return c_void_p(pin.address), pin.size, pin
+
+
+
+_glyph_dtypes = {}
+
+def _glyph_slot_dtype():
+    # numpy dtype overlaying the part of FT_GlyphSlotRec that goes from
+    # 'metrics' to 'bitmap_top' (see Face.load_glyphs)
+    if 'slot' not in _glyph_dtypes:
+        import numpy
+        start = FT_GlyphSlotRec.metrics.offset
+        names, formats, offsets = [], [], []
+        def add(name, ctype, offset):
+            names.append(name)
+            formats.append(numpy.dtype(ctype))
+            offsets.append(offset - start)
+        for name, ctype in FT_Glyph_Metrics._fields_:
+            add(name, ctype, start + getattr(FT_Glyph_Metrics, name).offset)
+        for name in ('linearHoriAdvance', 'linearVertAdvance'):
+            add(name, FT_Fixed, getattr(FT_GlyphSlotRec, name).offset)
+        advance = FT_GlyphSlotRec.advance.offset
+        add('advance_x', FT_Pos, advance + FT_Vector.x.offset)
+        add('advance_y', FT_Pos, advance + FT_Vector.y.offset)
+        bitmap = FT_GlyphSlotRec.bitmap.offset
+        for name in ('rows', 'width', 'pitch'):
+            add('bitmap_' + name, c_int,
+                bitmap + getattr(FT_Bitmap, name).offset)
+        add('bitmap_left', FT_Int, FT_GlyphSlotRec.bitmap_left.offset)
+        add('bitmap_top', FT_Int, FT_GlyphSlotRec.bitmap_top.offset)
+        size = FT_GlyphSlotRec.bitmap_top.offset + sizeof(FT_Int) - start
+        _glyph_dtypes['slot'] = numpy.dtype({'names': names,
+            'formats': formats, 'offsets': offsets, 'itemsize': size})
+    return _glyph_dtypes['slot']
+
+def _glyph_record_dtype():
+    # Packed numpy dtype of the records returned by Face.load_glyphs
+    if 'record' not in _glyph_dtypes:
+        import numpy
+        slot = _glyph_slot_dtype()
+        fields = [(name, slot.fields[name][0]) for name in slot.names]
+        _glyph_dtypes['record'] = numpy.dtype(
+            [('index', numpy.uint32)] + fields +
+            [('bitmap_offset', numpy.int64)])
+    return _glyph_dtypes['record']
+
+
 
 # -----------------------------------------------------------------------------
 #  Direct wrapper (simple renaming)
@@ -434,11 +576,134 @@ class Bitmap(object):
                the file 'example2.py' in the tutorial for a demonstration.''')
 
     def _get_buffer(self):
-        data = [self._FT_Bitmap.buffer[i] for i in range(self.rows*self.pitch)]
-        return data
+        view = self._get_view()
+        return list(view) if PY3 else list(bytearray(view))
     buffer = property(_get_buffer,
        doc = '''A typeless pointer to the bitmap buffer. This value should be
-                aligned on 32-bit boundaries in most cases.''')
+                aligned on 32-bit boundaries in most cases.
+
+                The bytes are returned as a list, in memory order. Use 'view'
+                to access them without copying.''')
+
+    def _get_view(self):
+        size = self.rows * abs(self.pitch)
+        if not size or not self._FT_Bitmap.buffer:
+            return memoryview(b'')
+        data = cast(self._FT_Bitmap.buffer, POINTER(c_ubyte * size)).contents
+        view = memoryview(data)
+        if not hasattr(view, 'cast'):
+            # Python 2 cannot reinterpret the ctypes format, copy the bytes
+            return memoryview(bytearray(data))
+        return view.cast('B')
+    view = property(_get_view,
+     doc = '''A flat memoryview over the 'rows*abs(pitch)' bytes of the bitmap
+              buffer, in memory order. No data is copied, except on Python 2
+              where the view is over a copy of the bytes.
+
+              When the pitch is negative, rows are stored bottom-up; use 'row'
+              to address them top-down whatever the flow.
+
+              The view points into memory owned by FreeType and is only valid
+              as long as the bitmap itself, i.e., until the next glyph is
+              loaded into the slot it comes from. Use 'copy' to keep the data
+              around longer.''')
+
+    def row(self, index):
+        '''
+        Return a memoryview over one row of the bitmap, including padding.
+
+        :param index: The row index, 0 being the top-most row whatever the
+                      sign of the pitch.
+        '''
+        rows, pitch = self.rows, self.pitch
+        if not 0 <= index < rows:
+            raise IndexError('bitmap row index out of range')
+        if pitch < 0:
+            index = rows - 1 - index
+        start = index * abs(pitch)
+        return self._get_view()[start:start + abs(pitch)]
+
+    def tobytes(self):
+        '''
+        Return a copy of the 'rows*abs(pitch)' bytes of the bitmap buffer,
+        rows being always ordered top-down.
+        '''
+        if self.pitch >= 0:
+            return self._get_view().tobytes()
+        return b''.join(self.row(i).tobytes() for i in range(self.rows))
+
+    def copy(self):
+        '''
+        Return a new Bitmap owning a copy of the pixel data, so that it
+        outlives the glyph slot or glyph it was taken from. Rows of the copy
+        are always stored top-down (positive pitch).
+        '''
+        rows, pitch = self.rows, abs(self.pitch)
+        data = (c_ubyte * (rows * pitch)).from_buffer_copy(self.tobytes())
+        bitmap = FT_Bitmap()
+        bitmap.rows = rows
+        bitmap.width = self._FT_Bitmap.width
+        bitmap.pitch = pitch
+        bitmap.buffer = cast(data, POINTER(c_ubyte))
+        bitmap.num_grays = self._FT_Bitmap.num_grays
+        bitmap.pixel_mode = self._FT_Bitmap.pixel_mode
+        bitmap.palette_mode = self._FT_Bitmap.palette_mode
+        bitmap.palette = self._FT_Bitmap.palette
+        result = Bitmap(bitmap)
+        result._data = data  # prevent gc
+        return result
+
+    def to_numpy(self, copy=False):
+        '''
+        Return the bitmap as a numpy array, shaped according to the pixel
+        mode and with the pitch turned into strides:
+
+          FT_PIXEL_MODE_GRAY:  (rows, width) uint8
+          FT_PIXEL_MODE_LCD:   (rows, width/3, 3) uint8
+          FT_PIXEL_MODE_LCD_V: (rows/3, width, 3) uint8
+          FT_PIXEL_MODE_BGRA:  (rows, width, 4) uint8, premultiplied BGRA
+          FT_PIXEL_MODE_MONO:  (rows, width) bool
+          FT_PIXEL_MODE_GRAY2 and FT_PIXEL_MODE_GRAY4: (rows, width) uint8
+                               gray levels
+
+        Rows are always ordered top-down, whatever the sign of the pitch.
+
+        :param copy: If False (the default), 8-bit modes return a view on
+                     the bitmap buffer that is only valid until the next glyph
+                     is loaded (see 'view'). Packed modes (mono, gray2, gray4)
+                     are always unpacked into a new array.
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        import numpy
+        rows, width, pitch = self.rows, self.width, self.pitch
+        mode = self.pixel_mode
+        data = numpy.frombuffer(self._get_view(), dtype=numpy.uint8)
+        data = data.reshape(rows, abs(pitch))
+        if pitch < 0:
+            data = data[::-1]
+
+        if mode == FT_PIXEL_MODE_GRAY:
+            array = data[:, :width]
+        elif mode == FT_PIXEL_MODE_LCD:
+            array = data[:, :width].reshape(rows, width // 3, 3)
+        elif mode == FT_PIXEL_MODE_LCD_V:
+            array = data[:, :width].reshape(rows // 3, 3, width)
+            array = array.transpose(0, 2, 1)
+        elif mode == FT_PIXEL_MODE_BGRA:
+            array = data[:, :4 * width].reshape(rows, width, 4)
+        elif mode == FT_PIXEL_MODE_MONO:
+            return numpy.unpackbits(data, axis=1)[:, :width].view(bool)
+        elif mode in (FT_PIXEL_MODE_GRAY2, FT_PIXEL_MODE_GRAY4):
+            bits = 2 if mode == FT_PIXEL_MODE_GRAY2 else 4
+            shifts = numpy.arange(8 - bits, -1, -bits, dtype=numpy.uint8)
+            array = (data[:, :, None] >> shifts) & ((1 << bits) - 1)
+            return array.reshape(rows, -1)[:, :width]
+        else:
+            raise ValueError('unsupported pixel mode %d' % mode)
+        return array.copy() if copy else array
 
     num_grays = property(lambda self: self._FT_Bitmap.num_grays,
           doc = '''This field is only used with FT_PIXEL_MODE_GRAY; it gives
@@ -547,6 +812,10 @@ class Charmap( object ):
 
 
 # -----------------------------------------------------------------------------
+# Maps point tags to their FT_CURVE_TAG part
+_CURVE_TAGS = bytes(bytearray(tag & 3 for tag in range(256)))
+
+
 class Outline( object ):
     '''
     FT_Outline wrapper.
@@ -564,26 +833,27 @@ class Outline( object ):
     n_contours = property(lambda self: self._FT_Outline.n_contours)
     def _get_contours(self):
         n = self._FT_Outline.n_contours
-        data = [self._FT_Outline.contours[i] for i in range(n)]
-        return data
+        if not n:
+            return []
+        return self._FT_Outline.contours[:n]
     contours = property(_get_contours,
          doc = '''The number of contours in the outline.''')
 
     n_points = property(lambda self: self._FT_Outline.n_points)
     def _get_points(self):
         n = self._FT_Outline.n_points
-        data = []
-        for i in range(n):
-            v = self._FT_Outline.points[i]
-            data.append( (v.x,v.y) )
-        return data
+        if not n:
+            return []
+        data = cast(self._FT_Outline.points, POINTER(FT_Pos))[:2*n]
+        return list(zip(data[0::2], data[1::2]))
     points = property( _get_points,
        doc = '''The number of points in the outline.''')
 
     def _get_tags(self):
         n = self._FT_Outline.n_points
-        data = [self._FT_Outline.tags[i] for i in range(n)]
-        return data
+        if not n:
+            return []
+        return self._FT_Outline.tags[:n]
     tags = property(_get_tags,
      doc = '''A list of 'n_points' chars, giving each outline point's type.
 
@@ -605,6 +875,60 @@ class Outline( object ):
                hints to the scan-converter and hinter on how to
                convert/grid-fit it. See FT_OUTLINE_FLAGS.''')
 
+    def _as_array(self, pointer, ctype, shape):
+        import numpy
+        count = shape[0] * (shape[1] if len(shape) > 1 else 1)
+        if not count:
+            return numpy.zeros(shape, dtype=ctype)
+        data = cast(pointer, POINTER(ctype * count)).contents
+        return numpy.frombuffer(data, dtype=ctype).reshape(shape)
+
+    def _get_points_array(self):
+        return self._as_array(self._FT_Outline.points, FT_Pos,
+                              (self._FT_Outline.n_points, 2))
+    points_array = property(_get_points_array,
+             doc = '''The outline's point coordinates as a (n_points, 2) numpy
+                      array. This is a view on the outline's memory, which is
+                      only valid as long as the outline itself (e.g., until the
+                      next glyph is loaded into the slot).''')
+
+    def _get_tags_array(self):
+        return self._as_array(self._FT_Outline.tags, c_ubyte,
+                              (self._FT_Outline.n_points,))
+    tags_array = property(_get_tags_array,
+           doc = '''The outline's point tags as a (n_points,) numpy array of
+                    uint8. See 'tags' for their meaning and 'points_array' for
+                    the lifetime of the view.''')
+
+    def _get_contours_array(self):
+        return self._as_array(self._FT_Outline.contours, c_short,
+                              (self._FT_Outline.n_contours,))
+    contours_array = property(_get_contours_array,
+               doc = '''The end point of each contour as a (n_contours,) numpy
+                        array of int16. See 'points_array' for the lifetime of
+                        the view.''')
+
+    def to_numpy(self, copy=False):
+        '''
+        Return the points, tags and contours arrays of the outline.
+
+        :param copy: If True, return arrays owning a copy of the data, which
+                     remain valid after the outline is gone. Otherwise, return
+                     views as 'points_array', 'tags_array' and
+                     'contours_array' do.
+
+        :return: points, tags, contours
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        arrays = (self._get_points_array(), self._get_tags_array(),
+                  self._get_contours_array())
+        if copy:
+            arrays = tuple(array.copy() for array in arrays)
+        return arrays
+
     def get_inside_border( self ):
         '''
         Retrieve the FT_StrokerBorder value corresponding to the 'inside'
@@ -625,6 +949,16 @@ class Outline( object ):
         '''
         return FT_Outline_GetInsideBorder( self._FT_Outline )
 
+    def translate( self, x_offset, y_offset ):
+        '''
+        Apply a simple translation to the points of an outline.
+
+        :param x_offset: The horizontal offset, in 26.6 fractional pixels.
+
+        :param y_offset: The vertical offset, in 26.6 fractional pixels.
+        '''
+        FT_Outline_Translate( byref(self._FT_Outline), x_offset, y_offset )
+
     def get_bbox(self):
         '''
         Compute the exact bounding box of an outline. This is slower than
@@ -736,6 +1070,259 @@ class Outline( object ):
 
 
 
+    # Verbs of the compact path returned by get_path
+    MOVE_TO, LINE_TO, CONIC_TO, CUBIC_TO = range(4)
+
+    def get_path(self, shift=0, delta=0):
+        '''
+        Decompose the outline into a compact path made of a verb array and a
+        coordinate array, without calling back into Python for each segment.
+
+        The result describes exactly the same segments, in the same order, as
+        the callbacks of 'decompose' would: Outline.MOVE_TO and
+        Outline.LINE_TO verbs consume one point, Outline.CONIC_TO two points
+        (control, end) and Outline.CUBIC_TO three points (control 1, control
+        2, end). Implicit on-curve points between consecutive conic control
+        points are inserted, and each contour is closed explicitly.
+
+        :param shift: Vectors are transformed via `x = (x << shift) - delta`
+                      and `y = (y << shift) - delta`, as in 'decompose'.
+
+        :param delta: See 'shift'.
+
+        :return: verbs, points as a (n,) uint8 and a (m, 2) int64 numpy array.
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        import numpy
+        outline = self._FT_Outline
+        n, count = outline.n_points, outline.n_contours
+        if not count:
+            return (numpy.zeros(0, dtype=numpy.uint8),
+                    numpy.zeros((0, 2), dtype=numpy.int64))
+        ON, CONIC, CUBIC = (FT_CURVE_TAG_ON, FT_CURVE_TAG_CONIC,
+                            FT_CURVE_TAG_CUBIC)
+        ends = outline.contours[:count]
+        kinds = bytearray(string_at(outline.tags, n).translate(_CURVE_TAGS))
+        # Points left out of the contours and the undefined tag 3 are left
+        # to FreeType, which rejects or reads them in its own way
+        if ends[-1] != n - 1 or 3 in kinds:
+            return self._decompose_path(shift, delta)
+        tags = numpy.frombuffer(kinds, dtype=numpy.uint8)
+
+        # On-curve points are implied between consecutive conic points,
+        # including from the last point of a contour to its first one.
+        # A contour starts at its first point, unless that one is a conic,
+        # in which case FreeType starts at the last point if it is on the
+        # curve, or at the point implied after it. That start is inserted
+        # before the first point; otherwise the first point is repeated
+        # after the last one (and its implied point, if any) to close the
+        # contour. 'inserted' counts the entries after the previous point,
+        # up to each point.
+        conic = tags == CONIC
+        implied = numpy.empty(n, dtype=bool)
+        numpy.logical_and(conic[:-1], conic[1:], out=implied[:-1])
+        inserted = numpy.empty(n + 1, dtype=numpy.intp)
+        numpy.add(implied, 1, out=inserted[1:])
+        inserted[0] = 0
+        contours, wraps = [], []
+        first = 0
+        for end in ends:
+            start = kinds[first]
+            # So are malformed contours and those starting with a cubic
+            # point (or ending with one after a conic)
+            if end < first or start == CUBIC or \
+               start == CONIC and kinds[end] == CUBIC:
+                return self._decompose_path(shift, delta)
+            rotated = start == CONIC
+            wrap = rotated and kinds[end] == CONIC
+            if wrap:
+                wraps.append((end, first))
+            implied[end] = wrap
+            inserted[first] += rotated
+            inserted[end + 1] = 1 + wrap + (not rotated)
+            contours.append((first, end, rotated, wrap))
+            first = end + 1
+        position = inserted.cumsum()
+        placed = position[:n]
+
+        points = numpy.frombuffer(string_at(outline.points,
+                                            n * sizeof(FT_Vector)),
+                                  dtype='i%d' % sizeof(FT_Pos)).reshape(n, 2)
+        if shift or delta:
+            points = (points.astype(numpy.int64) << shift) - delta
+        path = numpy.empty((position[n], 2), dtype=numpy.int64)
+        path[placed] = points
+        middles = implied.nonzero()[0]
+        if len(middles):
+            following = middles + 1
+            for end, first in wraps:
+                following[middles.searchsorted(end)] = first
+            pair = points[middles] + points[following]
+            # Divide by two rounding towards zero, as FreeType does
+            path[placed[middles] + 1] = (pair + (pair < 0)) >> 1
+        # Contour heads follow the previous contour end, an on-curve point.
+        # Their segment index is their position less the off-curve points
+        # before them.
+        offsets = position.tolist()
+        heads, starts, copies = [], [], []
+        for first, end, rotated, wrap in contours:
+            head = offsets[first] - rotated
+            if rotated:
+                starts.append(offsets[end] + wrap)
+                copies.append(head)
+            else:
+                starts.append(head)
+                copies.append(offsets[end] + 1)
+            heads.append(head - first + kinds.count(b'\x01', 0, first))
+        path[copies] = path[starts]
+
+        # Every on-curve point ends a segment, whose verb depends on the
+        # control points before it: none, one conic or two cubics
+        on = numpy.empty(len(path), dtype=bool)
+        on.fill(True)
+        on[placed] = tags == ON
+        ends = on.nonzero()[0]
+        verbs = numpy.empty(len(ends), dtype=numpy.uint8)
+        numpy.subtract(ends[1:], ends[:-1], out=verbs[1:], casting='unsafe')
+        if CUBIC in kinds:
+            # FreeType reads control points in other runs in its own way
+            runs = verbs[1:] - 1
+            runs = runs[runs > 0]
+            expected = numpy.repeat(numpy.where(runs == 1, CONIC, CUBIC), runs)
+            off = numpy.empty(len(path), dtype=numpy.uint8)
+            off[placed] = tags
+            if (runs > 2).any() or (off[~on] != expected).any():
+                return self._decompose_path(shift, delta)
+        verbs[heads] = self.MOVE_TO
+        return verbs, path
+
+    def _decompose_path(self, shift, delta):
+        # Build the get_path arrays through 'decompose', for the outlines
+        # get_path leaves to FreeType
+        import numpy
+        verbs, points = [], []
+        def segment(verb):
+            def callback(*args):
+                verbs.append(verb)
+                points.extend((vector.x, vector.y) for vector in args[:-1])
+            return callback
+        self.decompose(None, segment(self.MOVE_TO), segment(self.LINE_TO),
+                       segment(self.CONIC_TO), segment(self.CUBIC_TO),
+                       shift, delta)
+        return (numpy.array(verbs, dtype=numpy.uint8),
+                numpy.array(points, dtype=numpy.int64).reshape(-1, 2))
+
+    def _get_segments(self, scale, tolerance):
+        # Flatten the path into line segments, as (s, 2) start and end arrays
+        import numpy
+        verbs, points = self.get_path()
+        points = points * (scale / 64.0)
+        counts = (1, 1, 2, 3)
+        polylines, polyline = [], None
+        i = 0
+        for verb in verbs:
+            if verb == self.MOVE_TO:
+                polyline = [points[i:i + 1]]
+                polylines.append(polyline)
+            elif verb == self.LINE_TO:
+                polyline.append(points[i:i + 1])
+            else:
+                ctrl = points[i - 1:i + counts[verb]]
+                bend = numpy.abs(ctrl[2:] - 2 * ctrl[1:-1] + ctrl[:-2]).max()
+                bend *= 0.25 if verb == self.CONIC_TO else 0.75
+                steps = max(1, int(numpy.ceil(numpy.sqrt(bend / tolerance))))
+                t = numpy.arange(1, steps + 1, dtype=numpy.float64)[:, None]
+                t /= steps
+                u = 1 - t
+                if verb == self.CONIC_TO:
+                    curve = u*u*ctrl[0] + 2*u*t*ctrl[1] + t*t*ctrl[2]
+                else:
+                    curve = (u*u*u*ctrl[0] + 3*u*u*t*ctrl[1] +
+                             3*u*t*t*ctrl[2] + t*t*t*ctrl[3])
+                polyline.append(curve)
+            i += counts[verb]
+        starts, ends = [], []
+        for polyline in polylines:
+            polyline = numpy.concatenate(polyline)
+            starts.append(polyline[:-1])
+            ends.append(polyline[1:])
+        if not starts:
+            empty = numpy.zeros((0, 2))
+            return empty, empty
+        return numpy.concatenate(starts), numpy.concatenate(ends)
+
+    def to_sdf(self, spread=8, resolution=1.0):
+        '''
+        Compute a signed distance field of the outline.
+
+        The field follows the conventions of FreeType's FT_RENDER_MODE_SDF:
+        the bitmap covers the outline's control box (rounded out to integer
+        pixels) grown by 'spread' pixels on each side, and each pixel holds
+        the distance from its center to the outline, mapped so that 128 lies
+        on the outline, 255 (resp. 0) at 'spread' pixels inside (resp.
+        outside) it. Curves are flattened to within 1/50th of a pixel.
+
+        :param spread: The largest distance represented in the field, in
+                       pixels.
+
+        :param resolution: The number of field pixels per outline pixel.
+
+        :return: field, left, top where field is a (rows, width) uint8 numpy
+                 array and left, top are the bearings of the field, in field
+                 pixels, as for GlyphSlot.bitmap_left and bitmap_top.
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        import numpy
+        start, end = self._get_segments(resolution, 1 / 50.0)
+        if not len(start):
+            return numpy.zeros((0, 0), dtype=numpy.uint8), 0, 0
+        coords = numpy.concatenate((start, end))
+        x_min, y_min = numpy.floor(coords.min(axis=0)).astype(int)
+        x_max, y_max = numpy.ceil(coords.max(axis=0)).astype(int)
+        left, top = x_min - spread, y_max + spread
+        width = x_max - x_min + 2 * spread
+        rows = y_max - y_min + 2 * spread
+
+        x = left + 0.5 + numpy.arange(width, dtype=numpy.float64)
+        edge = end - start
+        length = numpy.maximum((edge * edge).sum(axis=1), 1e-12)
+        even_odd = self.flags & FT_OUTLINE_EVEN_ODD_FILL
+        field = numpy.empty((rows, width), dtype=numpy.uint8)
+        # Process a few rows at a time to bound the (pixels, segments) arrays
+        chunk = max(1, (1 << 20) // (width * len(start)))
+        for row in range(0, rows, chunk):
+            y = top - 0.5 - numpy.arange(row, min(row + chunk, rows),
+                                         dtype=numpy.float64)
+            px = numpy.broadcast_to(x, (len(y), width)).reshape(-1, 1)
+            py = numpy.repeat(y, width).reshape(-1, 1)
+            dx, dy = px - start[:, 0], py - start[:, 1]
+            t = (dx * edge[:, 0] + dy * edge[:, 1]) / length
+            numpy.clip(t, 0, 1, out=t)
+            dx -= t * edge[:, 0]
+            dy -= t * edge[:, 1]
+            distance = numpy.sqrt((dx * dx + dy * dy).min(axis=1))
+            # Winding number of a ray cast towards +x
+            up = (start[:, 1] <= py) & (end[:, 1] > py)
+            down = (end[:, 1] <= py) & (start[:, 1] > py)
+            cross = (edge[:, 0] * (py - start[:, 1]) -
+                     edge[:, 1] * (px - start[:, 0]))
+            winding = ((up & (cross > 0)).sum(axis=1) -
+                       (down & (cross < 0)).sum(axis=1))
+            inside = winding & 1 if even_odd else winding != 0
+            value = numpy.floor(distance * (128.0 / spread))
+            value = numpy.where(inside, numpy.minimum(value, 127),
+                                -numpy.minimum(value, 128))
+            field[row:row + len(y)] = (value + 128).reshape(len(y), width)
+        return field, int(left), int(top)
+
+
+
 # -----------------------------------------------------------------------------
 class Glyph( object ):
     '''
@@ -955,6 +1542,66 @@ class GlyphSlot( object ):
         if error: raise FT_Exception( error )
         return Glyph( aglyph )
 
+    def render( self, render_mode ):
+        '''
+        Convert the glyph image loaded in the slot to a bitmap, as done by
+        FT_LOAD_RENDER. Nothing is done if the slot already holds a bitmap.
+
+        :param render_mode: This is the render mode used to render the glyph
+                            image into a bitmap. See FT_Render_Mode for a list
+                            of possible values.
+        '''
+        error = FT_Render_Glyph( self._FT_GlyphSlot, render_mode )
+        if error: raise FT_Exception( error )
+
+    def render_sdf( self, spread = 8, resolution = 1.0 ):
+        '''
+        Render a signed distance field of the outline glyph loaded in the
+        slot (that is, loaded without FT_LOAD_RENDER).
+
+        FreeType's own FT_RENDER_MODE_SDF renderer is used when available
+        (FreeType 2.11 and later), which replaces the slot's outline with the
+        field bitmap. Otherwise, the field is computed from the outline with
+        numpy (see Outline.to_sdf), leaving the slot untouched.
+
+        :param spread: The largest distance represented in the field, in
+                       pixels. FreeType accepts values from 2 to 32.
+
+        :param resolution: The number of field pixels per glyph pixel.
+
+        :return: field, left, top where field is a (rows, width) uint8 numpy
+                 array where 128 lies on the outline and larger values are
+                 inside, and left, top are the bearings of the field, in field
+                 pixels.
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        if self.format != FT_GLYPH_FORMAT_OUTLINE:
+            raise FT_Exception( 0x12 )
+        if version() < (2, 11, 0):
+            return self.outline.to_sdf( spread, resolution )
+        # The spread is a property of the slot's library, which is restored
+        # once the field is rendered
+        library = self._FT_GlyphSlot.contents.library
+        previous, value = FT_Int(), FT_Int( spread )
+        error = FT_Property_Get( library, b"sdf", b"spread", byref(previous) )
+        if error: raise FT_Exception( error )
+        error = FT_Property_Set( library, b"sdf", b"spread", byref(value) )
+        if error: raise FT_Exception( error )
+        try:
+            outline = self._FT_GlyphSlot.contents.outline
+            if resolution != 1:
+                scale = int(round(resolution * 0x10000))
+                matrix = FT_Matrix( scale, 0, 0, scale )
+                FT_Outline_Transform( byref(outline), byref(matrix) )
+            self.render( FT_RENDER_MODE_SDF )
+        finally:
+            FT_Property_Set( library, b"sdf", b"spread", byref(previous) )
+        return ( self.bitmap.to_numpy( copy = True ),
+                 self.bitmap_left, self.bitmap_top )
+
     def _get_bitmap( self ):
         return Bitmap( self._FT_GlyphSlot.contents.bitmap )
     bitmap = property( _get_bitmap,
@@ -1031,8 +1678,256 @@ class GlyphSlot( object ):
                            WYSIWYG layout. Only relevant for outline glyphs.''')
 
 
+# -----------------------------------------------------------------------------
+class Coverage( object ):
+    '''
+    A set of character codes, stored as sorted, disjoint [start, stop)
+    ranges, as returned by Face.coverage.
+
+    Coverages support 'in', len (the number of codes), equality and the set
+    operators | (union), & (intersection), - (difference) and ^ (symmetric
+    difference).
+
+    **Note** This class requires numpy.
+    '''
+
+    def __init__( self, ranges = () ):
+        '''
+        Create a new Coverage object.
+
+        :param ranges: A sequence (or (n, 2) numpy array) of [start, stop)
+                       ranges, sorted and disjoint.
+        '''
+        import numpy
+        ranges = numpy.array(ranges, dtype=numpy.int64).reshape(-1, 2)
+        ranges.setflags(write=False)
+        self._ranges = ranges
+
+    @classmethod
+    def from_codes( cls, codes ):
+        '''
+        Create a Coverage from character codes.
+
+        :param codes: A string, or a sequence (or numpy array) of character
+                      codes, in any order.
+        '''
+        import numpy
+        if isinstance(codes, (str,unicode)):
+            codes = [ord(c) for c in codes]
+        codes = numpy.unique(numpy.asarray(codes, dtype=numpy.int64))
+        if not len(codes):
+            return cls()
+        breaks = numpy.flatnonzero(numpy.diff(codes) != 1) + 1
+        starts = codes[numpy.concatenate(([0], breaks))]
+        stops = codes[numpy.concatenate((breaks - 1, [len(codes) - 1]))] + 1
+        return cls(numpy.column_stack((starts, stops)))
+
+    ranges = property( lambda self: self._ranges,
+       doc = '''The (n, 2) read-only numpy array of [start, stop) ranges.''')
+
+    def codes( self ):
+        '''
+        Return all the character codes of the coverage as a numpy array.
+        '''
+        import numpy
+        starts, stops = self._ranges.T
+        sizes = stops - starts
+        return numpy.arange(sizes.sum()) + \
+            numpy.repeat(starts - (numpy.cumsum(sizes) - sizes), sizes)
+
+    def covers( self, codes ):
+        '''
+        Tell which character codes are covered.
+
+        :param codes: A string, or a sequence (or numpy array) of character
+                      codes.
+
+        :return: A numpy boolean array, of the shape of codes.
+        '''
+        import numpy
+        if isinstance(codes, (str,unicode)):
+            codes = numpy.frombuffer(codes.encode('utf-32-le'), dtype='<u4')
+        codes = numpy.asarray(codes, dtype=numpy.int64)
+        if not len(self._ranges):
+            return numpy.zeros(codes.shape, dtype=bool)
+        starts, stops = self._ranges.T
+        position = numpy.searchsorted(starts, codes, side='right') - 1
+        return (position >= 0) & (codes < stops[position])
+
+    def __contains__( self, code ):
+        if isinstance(code, (str,unicode)):
+            code = ord(code)
+        return bool(self.covers([code])[0])
+
+    def __len__( self ):
+        return int((self._ranges[:, 1] - self._ranges[:, 0]).sum())
+
+    def __eq__( self, other ):
+        return isinstance(other, Coverage) and \
+            (self._ranges.shape == other._ranges.shape) and \
+            bool((self._ranges == other._ranges).all())
+
+    def __ne__( self, other ):
+        return not self == other
+
+    def __repr__( self ):
+        return '<Coverage of %d codes in %d ranges>' % (len(self),
+                                                         len(self._ranges))
+
+    def _combine( self, other, operator ):
+        # Split the code space at all the range boundaries, and keep the
+        # pieces selected by the operator
+        import numpy
+        bounds = numpy.union1d(self._ranges.ravel(), other._ranges.ravel())
+        if len(bounds) < 2:
+            return Coverage()
+        pieces = bounds[:-1]
+        keep = operator(self.covers(pieces), other.covers(pieces))
+        edges = numpy.diff(numpy.concatenate(([0], keep.astype(numpy.int8),
+                                              [0])))
+        starts = bounds[numpy.flatnonzero(edges == 1)]
+        stops = bounds[numpy.flatnonzero(edges == -1)]
+        return Coverage(numpy.column_stack((starts, stops)))
+
+    def __or__( self, other ):
+        return self._combine(other, lambda a, b: a | b)
+
+    def __and__( self, other ):
+        return self._combine(other, lambda a, b: a & b)
+
+    def __sub__( self, other ):
+        return self._combine(other, lambda a, b: a & ~b)
+
+    def __xor__( self, other ):
+        return self._combine(other, lambda a, b: a ^ b)
+
+
+
+# -----------------------------------------------------------------------------
+class TextMetrics( object ):
+    '''
+    The metrics of a line of text, as computed by Face.measure. All the
+    values are expressed in 26.6 fractional pixels.
+    '''
+    __slots__ = ('advance', 'bbox', 'ascender', 'descender', 'height')
+
+    def __init__( self, advance, bbox, ascender, descender, height ):
+        '''
+        Create a new TextMetrics object.
+
+        :param advance: The horizontal advance of the text, kerning included.
+
+        :param bbox: The ink box of the text, as a BBox relative to the origin
+                     of the first glyph (upwards y). It is empty (all zeros)
+                     if the text has no ink.
+
+        :param ascender: The ascender of the face at its current size.
+
+        :param descender: The descender of the face at its current size.
+
+        :param height: The baseline-to-baseline distance of the face at its
+                       current size.
+        '''
+        self.advance = advance
+        self.bbox = bbox
+        self.ascender = ascender
+        self.descender = descender
+        self.height = height
+
+
+
+# -----------------------------------------------------------------------------
+class KerningTable( object ):
+    '''
+    The non-zero kerning vectors between all the pairs of a set of glyphs,
+    as computed by Face.kerning_table.
+
+    Pairs are stored sparsely, as sorted (left, right) keys and a (n, 2)
+    array of kerning vectors.
+    '''
+    def __init__( self, num_glyphs, lefts, rights, values ):
+        '''
+        Create a new KerningTable object.
+
+        :param num_glyphs: The number of glyphs in the face.
+
+        :param lefts: Left glyph indices of the pairs.
+
+        :param rights: Right glyph indices of the pairs.
+
+        :param values: Kerning vectors of the pairs, as a (n, 2) array.
+        '''
+        import numpy
+        self._num_glyphs = num_glyphs
+        keys = (numpy.asarray(lefts, dtype=numpy.int64) * num_glyphs +
+                numpy.asarray(rights, dtype=numpy.int64))
+        order = numpy.argsort(keys)
+        self._keys = keys[order]
+        self._values = numpy.asarray(values, dtype=numpy.int64)
+        self._values = self._values.reshape(-1, 2)[order]
+
+    def __len__( self ):
+        return len(self._keys)
+
+    def _get_pairs( self ):
+        lefts, rights = divmod(self._keys, self._num_glyphs)
+        return dict(zip(zip(lefts.tolist(), rights.tolist()),
+                        map(tuple, self._values.tolist())))
+    pairs = property( _get_pairs,
+      doc = '''A dict mapping (left, right) glyph index pairs to their (x, y)
+               kerning vector.''')
+
+    def get( self, left, right ):
+        '''
+        Return the (x, y) kerning vector between two glyphs, (0, 0) if the
+        pair has no kerning.
+        '''
+        import numpy
+        key = left * self._num_glyphs + right
+        position = numpy.searchsorted(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return tuple(self._values[position].tolist())
+        return (0, 0)
+
+    def lookup( self, glyphs ):
+        '''
+        Return the kerning to apply before each glyph of a run.
+
+        :param glyphs: A sequence (or numpy array) of glyph indices.
+
+        :return: A (n, 2) numpy array, whose row i is the kerning vector
+                 between glyphs i-1 and i (the first row is always zero).
+        '''
+        import numpy
+        glyphs = numpy.asarray(glyphs, dtype=numpy.int64)
+        kerning = numpy.zeros((len(glyphs), 2), dtype=numpy.int64)
+        if len(glyphs) < 2 or not len(self._keys):
+            return kerning
+        keys = glyphs[:-1] * self._num_glyphs + glyphs[1:]
+        position = numpy.searchsorted(self._keys, keys)
+        position = numpy.minimum(position, len(self._keys) - 1)
+        found = self._keys[position] == keys
+        kerning[1:][found] = self._values[position[found]]
+        return kerning
+
+
+
 # -----------------------------------------------------------------------------
 #  Face wrapper
+# -----------------------------------------------------------------------------
+class _LazyStream( object ):
+    # Marks a stream to be read lazily by Face (see Face.from_stream)
+    def __init__( self, stream, close ):
+        self.stream = stream
+        self.close = close
+
+class _FontBytes( object ):
+    # Marks font contents given as bytes, which Face would take for a path
+    def __init__( self, data ):
+        self.data = data
+
+
+
 # -----------------------------------------------------------------------------
 class Face( object ):
     '''
@@ -1041,25 +1936,63 @@ class Face( object ):
     FreeType root face class structure. A face object models a typeface in a
     font file.
     '''
-    def __init__( self, path_or_stream, index = 0 ):
+    # Number of tables kept by kerning_table
+    KERNING_TABLES = 8
+
+    # Longest text measured in plain Python by measure_many, where numpy
+    # costs more than it saves
+    _SHORT_TEXT = 48
+
+    def __init__( self, path_or_stream, index = 0, library = None ):
         '''
         Build a new Face
 
-        :param Union[str, typing.BinaryIO] path_or_stream:
-            A path to the font file or an io.BytesIO stream.
+        :param Union[str, typing.BinaryIO, bytearray, memoryview, mmap.mmap] path_or_stream:
+            A path to the font file, an io.BytesIO stream, or a buffer
+            holding the font file (see 'from_bytes').
 
         :param int index:
                The index of the face within the font.
                The first face has index 0.
+
+        :param library:
+               The FT_Library handle the face is created in, the one
+               returned by get_handle if None. Faces of different libraries
+               can be used from different threads at the same time; the
+               library is kept alive as long as the face exists.
         '''
-        library = get_handle( )
+        if library is None:
+            library = get_handle( )
+        self._library = library
         face = FT_Face( )
         self._FT_Face = None
         #error = FT_New_Face( library, path_or_stream, 0, byref(face) )
         self._filebodys = []
-        if hasattr(path_or_stream, "read"):
-            error = self._init_from_memory(library, face, index, path_or_stream.read())
+        self._advance_tables = {}
+        self._cmap_table = None
+        self._coverage = None
+        self._kerning_tables = OrderedDict()
+        self._kerning_pairs = {}
+        self._glyph_metrics = {}
+        self._kerning = FT_Vector(0,0)
+        self._transform = None
+        self._size_request = None
+        # How to reopen the face, see '__reduce__'
+        self._source = None
+        if isinstance(path_or_stream, (bytearray, memoryview, mmap.mmap)):
+            error = self._init_from_buffer(library, face, index, path_or_stream)
+            self._source = ('buffer', path_or_stream)
+        elif isinstance(path_or_stream, _FontBytes):
+            error = self._init_from_memory(library, face, index, path_or_stream.data)
+            self._source = ('buffer', path_or_stream.data)
+        elif isinstance(path_or_stream, _LazyStream):
+            error = self._init_from_stream(library, face, index, path_or_stream)
+        elif hasattr(path_or_stream, "read"):
+            filebody = path_or_stream.read()
+            error = self._init_from_memory(library, face, index, filebody)
+            self._source = ('buffer', filebody)
         else:
+            self._source = ('path', path_or_stream)
             try:
                 error = self._init_from_file(library, face, index, path_or_stream)
             except UnicodeError:
@@ -1070,6 +2003,7 @@ class Face( object ):
             raise FT_Exception(error)
         self._index = index
         self._FT_Face = face
+        _faces.add(self)
 
     def _init_from_file(self, library, face, index, path):
         u_filename = c_char_p(_encode_filename(path))
@@ -1083,9 +2017,178 @@ class Face( object ):
         self._filebodys.append(byte_stream)  # prevent gc
         return error
 
+    def _init_from_buffer(self, library, face, index, buffer):
+        # FreeType reads the font straight from the buffer, which is pinned
+        # for the lifetime of the face
+        base, size, keep = _buffer_address(buffer)
+        error = FT_New_Memory_Face(library, base, size, index, byref(face))
+        self._filebodys.append(keep)
+        return error
+
+    def _init_from_stream(self, library, face, index, lazy):
+        # FreeType seeks and reads the stream on demand through callbacks
+        stream, close = lazy.stream, lazy.close
+        readinto = getattr(stream, "readinto", None)
+
+        def read(rec, offset, buffer, count):
+            try:
+                stream.seek(offset)
+                if not count:
+                    return 0
+                if readinto is None:
+                    data = stream.read(count)
+                    memmove(buffer, data, len(data))
+                    return len(data)
+                view = memoryview((c_ubyte * count).from_address(buffer))
+                done = 0
+                while done < count:
+                    n = readinto(view[done:])
+                    if not n:
+                        break
+                    done += n
+                return done
+            except Exception:
+                # A failed seek is reported with a non-zero value, a failed
+                # read with fewer bytes than requested
+                return 0 if count else 1
+
+        def done(rec):
+            if close:
+                stream.close()
+
+        rec = FT_StreamRec()
+        stream.seek(0, io.SEEK_END)
+        rec.size = stream.tell()
+        rec.read = FT_Stream_IoFunc(read)
+        rec.close = FT_Stream_CloseFunc(done)
+        args = FT_Open_Args()
+        args.flags = FT_OPEN_STREAM
+        args.stream = cast(pointer(rec), c_void_p)
+        # The callbacks and the stream record must outlive the face
+        self._filebodys.append(rec)
+        return FT_Open_Face(library, byref(args), index, byref(face))
+
+    @classmethod
+    def from_stream(cls, stream, index=0, close=False, library=None):
+        '''
+        Build a new Face reading a font lazily from a seekable binary stream.
+
+        Unlike passing the stream to the constructor, which reads it whole,
+        FreeType seeks to and reads only the parts of the font it needs, when
+        it needs them. This is much cheaper when only a few tables or glyphs
+        of a large font are used.
+
+        :param stream: A readable and seekable binary file-like object. It
+                       must stay open while the face exists, and it must not
+                       be used concurrently with the face.
+
+        :param int index: The index of the face within the font.
+
+        :param bool close: Whether to close the stream when the face is
+                           discarded.
+
+        :param library: The FT_Library handle, see the constructor.
+        '''
+        return cls(_LazyStream(stream, close), index, library)
+
+    @classmethod
+    def from_bytes(cls, bytes_, index=0, library=None):
+        '''
+        Build a new Face from the contents of a font file.
+
+        The data is not copied: FreeType reads it in place, and the buffer is
+        kept alive (and, when mutable, locked against resizing) as long as
+        the face exists. It must not be modified in the meantime. On Python
+        2, buffers other than bytes are copied.
+
+        :param bytes_: The font file contents, as bytes or any contiguous
+                       buffer-protocol object (bytearray, memoryview, mmap,
+                       numpy array, ...).
+
+        :param int index: The index of the face within the font.
+
+        :param library: The FT_Library handle, see the constructor.
+        '''
+        if isinstance(bytes_, bytes):
+            bytes_ = _FontBytes(bytes_)
+        elif not isinstance(bytes_, (bytearray, memoryview, mmap.mmap)):
+            bytes_ = memoryview(bytes_)
+        return cls(bytes_, index, library)
+
     @classmethod
-    def from_bytes(cls, bytes_, index=0):
-         return cls(io.BytesIO(bytes_), index)
+    def from_mmap(cls, path, index=0, library=None):
+        '''
+        Build a new Face from a memory map of a font file.
+
+        The file is mapped read-only and never read as a whole: FreeType
+        only touches the pages of the tables and glyphs it needs, and these
+        pages are shared with the system's page cache, hence with every
+        process that maps the same file.
+
+        :param str path: A path to the font file.
+
+        :param int index: The index of the face within the font.
+
+        :param library: The FT_Library handle, see the constructor.
+        '''
+        with open(path, mode="rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        face = cls(mapping, index, library)
+        face._source = ('mmap', path)
+        return face
+
+    def __reduce__( self ):
+        '''
+        Faces are pickled by reference to their source (the path of the font
+        file, or its contents), face index, size request, charmap and
+        transform. They are reopened with the global library when unpickled.
+        Faces reading a stream lazily (see 'from_stream') cannot be pickled.
+
+        Caches of glyph metrics, kerning and coverage are not pickled.
+        '''
+        if self._source is None:
+            raise TypeError('cannot pickle a Face reading from a stream')
+        kind, value = self._source
+        if kind == 'buffer' and not isinstance(value, bytes):
+            value = memoryview(value).tobytes()
+        return _restore_face, (kind, value, self._index, self._get_state())
+
+    def _get_state( self ):
+        # The settings carried over when the face is pickled or reopened
+        charmap = None
+        if self._FT_Face.contents.charmap:
+            charmap = self.charmap.index
+        return {'size': self._size_request, 'charmap': charmap,
+                'transform': self._transform}
+
+    def _set_state( self, state ):
+        size = state['size']
+        if size is not None:
+            method = {'char': self.set_char_size,
+                      'pixel': self.set_pixel_sizes,
+                      'strike': self.select_size}[size[0]]
+            method(*size[1])
+        charmap = state['charmap']
+        if charmap is not None and (not self._FT_Face.contents.charmap or
+                                    self.charmap.index != charmap):
+            self.set_charmap(charmap)
+        transform = state['transform']
+        if transform is not None:
+            self.set_transform(FT_Matrix(*transform[:4]),
+                               FT_Vector(*transform[4:]))
+
+    def _reopen( self ):
+        # Replace the FT_Face by a new one opened from the same source in the
+        # global library, keeping the settings and caches. This runs in a
+        # forked child, where the old face and library may be in the middle
+        # of a call: they are leaked rather than freed, and the buffers the
+        # old face points to are kept alive.
+        state = self._get_state()
+        clone = _open_face(self._source[0], self._source[1], self._index)
+        clone._set_state(state)
+        self._FT_Face, clone._FT_Face = clone._FT_Face, None
+        self._library = clone._library
+        self._filebodys = clone._filebodys + self._filebodys
 
     def __del__( self ):
         '''
@@ -1159,6 +2262,7 @@ class Face( object ):
         '''
         error = FT_Set_Char_Size( self._FT_Face, width, height, hres, vres )
         if error: raise FT_Exception( error)
+        self._size_request = ('char', (width, height, hres, vres))
 
     def set_pixel_sizes( self, width, height ):
         '''
@@ -1171,6 +2275,7 @@ class Face( object ):
         '''
         error = FT_Set_Pixel_Sizes( self._FT_Face, width, height )
         if error: raise FT_Exception(error)
+        self._size_request = ('pixel', (width, height))
 
     def select_charmap( self, encoding ):
         '''
@@ -1188,6 +2293,8 @@ class Face( object ):
         '''
         error = FT_Select_Charmap( self._FT_Face, encoding )
         if error: raise FT_Exception(error)
+        self._cmap_table = None
+        self._coverage = None
 
     def set_charmap( self, charmap ):
         '''
@@ -1204,6 +2311,8 @@ class Face( object ):
             # Treat "charmap" as plain number
             error = FT_Set_Charmap( self._FT_Face, self._FT_Face.contents.charmaps[charmap] )
         if error : raise FT_Exception(error)
+        self._cmap_table = None
+        self._coverage = None
 
     def get_char_index( self, charcode ):
         '''
@@ -1223,6 +2332,165 @@ class Face( object ):
             charcode = ord(charcode)
         return FT_Get_Char_Index( self._FT_Face, charcode )
 
+    def get_char_indices( self, charcodes ):
+        '''
+        Return the glyph indices of several character codes at once.
+
+        :param charcodes: A string, or a sequence (or numpy array) of
+                          character codes.
+
+        :return: A numpy array of glyph indices, 0 standing for the 'missing
+                 glyph'.
+
+        **Note**:
+
+          The mapping of the current charmap is read once and cached on the
+          face, as a dense table or as sorted arrays depending on the spread
+          of the character codes. The cache is dropped when the charmap is
+          changed through 'select_charmap' or 'set_charmap'.
+
+          This method requires numpy.
+        '''
+        import numpy
+        if isinstance(charcodes, (str,unicode)):
+            charcodes = numpy.frombuffer(charcodes.encode('utf-32-le'),
+                                         dtype='<u4')
+        charcodes = numpy.asarray(charcodes, dtype=numpy.uint32)
+        codes, glyphs, dense = self._get_cmap_table()
+        if dense is not None:
+            inside = charcodes < len(dense)
+            indices = numpy.zeros(charcodes.shape, dtype=numpy.uint32)
+            indices[inside] = dense[charcodes[inside]]
+            return indices
+        if not len(codes):
+            return numpy.zeros(charcodes.shape, dtype=numpy.uint32)
+        position = numpy.searchsorted(codes, charcodes)
+        position = numpy.minimum(position, len(codes) - 1)
+        return numpy.where(codes[position] == charcodes, glyphs[position], 0)
+
+    def coverage( self ):
+        '''
+        Return the character codes mapped to a glyph by the current charmap
+        (usually Unicode), as a Coverage.
+
+        **Note**:
+
+          The coverage is computed once and cached on the face, until the
+          charmap is changed through 'select_charmap' or 'set_charmap'. For
+          the common TrueType/OpenType cmap subtables, it is decoded in bulk
+          from the 'cmap' table rather than code by code.
+
+          This method requires numpy.
+        '''
+        if self._coverage is None:
+            self._coverage = Coverage.from_codes(self._get_cmap_table()[0])
+        return self._coverage
+
+    def _get_cmap_table( self ):
+        # Character codes and glyph indices of the current charmap, plus a
+        # dense lookup table when the codes are not too sparse.
+        if self._cmap_table is None:
+            import numpy
+            table = self._read_cmap_subtable()
+            if table is not None:
+                codes, glyphs = table
+            else:
+                codes, glyphs = [], []
+                agindex = FT_UInt()
+                charcode = FT_Get_First_Char( self._FT_Face, byref(agindex) )
+                while agindex.value:
+                    codes.append(charcode)
+                    glyphs.append(agindex.value)
+                    charcode = FT_Get_Next_Char( self._FT_Face, charcode,
+                                                 byref(agindex) )
+            codes = numpy.array(codes, dtype=numpy.uint32)
+            glyphs = numpy.array(glyphs, dtype=numpy.uint32)
+            dense = None
+            if len(codes) and codes[-1] < max(0x10000, 16 * len(codes)):
+                dense = numpy.zeros(int(codes[-1]) + 1, dtype=numpy.uint32)
+                dense[codes] = glyphs
+            self._cmap_table = codes, glyphs, dense
+        return self._cmap_table
+
+    def _read_cmap_subtable( self ):
+        # Character codes and glyph indices of the current charmap, decoded
+        # at once from the sfnt 'cmap' table for the common subtable formats
+        # (4, 12 and 13), rather than with one FT_Get_Next_Char call per
+        # code. None if the charmap is not backed by such a subtable.
+        import numpy
+        charmap = self._FT_Face.contents.charmap
+        try:
+            format = FT_Get_CMap_Format( charmap ) if charmap else -1
+        except NameError:
+            return None
+        if format not in (4, 12, 13):
+            return None
+        tag, length = 0x636D6170, FT_ULong(0)
+        if FT_Load_Sfnt_Table( self._FT_Face, tag, 0, None, byref(length) ):
+            return None
+        data = (c_ubyte * length.value)()
+        if FT_Load_Sfnt_Table( self._FT_Face, tag, 0, data, byref(length) ):
+            return None
+
+        def read(dtype, offset, count=1):
+            return numpy.frombuffer(data, dtype, count, offset)
+
+        try:
+            records = read('>u2', 4, 4 * int(read('>u2', 2)[0])).reshape(-1, 4)
+            for platform_id, encoding_id, high, low in records.tolist():
+                base = high << 16 | low
+                if (platform_id, encoding_id) != \
+                   (charmap.contents.platform_id, charmap.contents.encoding_id):
+                    continue
+                if read('>u2', base)[0] == format:
+                    break
+            else:
+                return None
+            if format == 4:
+                count = int(read('>u2', base + 6)[0]) // 2
+                # endCode, reservedPad, startCode, idDelta, idRangeOffset
+                arrays = read('>u2', base + 14, 4 * count + 1)
+                arrays = arrays.astype(numpy.int64)
+                ends, starts, deltas, offsets = (
+                    arrays[:count], arrays[count + 1:2 * count + 1],
+                    arrays[2 * count + 1:3 * count + 1],
+                    arrays[3 * count + 1:])
+                where = base + 16 + 6 * count + 2 * numpy.arange(count)
+            else:
+                count = int(read('>u4', base + 12)[0])
+                groups = read('>u4', base + 16, 3 * count).reshape(-1, 3)
+                starts, ends, firsts = groups.astype(numpy.int64).T
+                ends = numpy.minimum(ends, 0x10FFFF)
+        except ValueError:
+            return None
+
+        # Expand the segments (or groups) into individual codes
+        sizes = numpy.maximum(ends - starts + 1, 0)
+        segment = numpy.repeat(numpy.arange(len(sizes)), sizes)
+        codes = numpy.arange(len(segment)) - \
+            numpy.repeat(numpy.cumsum(sizes) - sizes, sizes)
+        step = codes
+        codes = codes + starts[segment]
+        if format == 4:
+            glyphs = (codes + deltas[segment]) & 0xFFFF
+            indirect = offsets[segment] != 0
+            address = (where[segment] + offsets[segment] + 2 * step)[indirect]
+            inside = address + 1 < len(data)
+            raw = numpy.frombuffer(data, numpy.uint8).astype(numpy.int64)
+            values = numpy.zeros(len(address), dtype=numpy.int64)
+            values[inside] = raw[address[inside]] << 8 | raw[address[inside] + 1]
+            values = numpy.where(values != 0,
+                                 (values + deltas[segment][indirect]) & 0xFFFF,
+                                 0)
+            glyphs[indirect] = values
+        elif format == 12:
+            glyphs = firsts[segment] + step
+        else:
+            glyphs = firsts[segment]
+        keep = (glyphs != 0) & (glyphs < self.num_glyphs)
+        codes, first = numpy.unique(codes[keep], return_index=True)
+        return codes, glyphs[keep][first]
+
     def get_glyph_name(self, agindex, buffer_max=64):
         '''
         This function is used to return the glyph name for the given charcode.
@@ -1339,6 +2607,8 @@ class Face( object ):
         '''
         FT_Set_Transform( self._FT_Face,
                           byref(matrix), byref(delta) )
+        self._transform = (matrix.xx, matrix.xy, matrix.yx, matrix.yy,
+                           delta.x, delta.y)
 
     def select_size( self, strike_index ):
         '''
@@ -1349,6 +2619,7 @@ class Face( object ):
         '''
         error = FT_Select_Size( self._FT_Face, strike_index )
         if error: raise FT_Exception( error )
+        self._size_request = ('strike', (strike_index,))
 
     def load_glyph( self, index, flags = FT_LOAD_RENDER ):
         '''
@@ -1377,6 +2648,72 @@ class Face( object ):
         error = FT_Load_Glyph( self._FT_Face, index, flags )
         if error: raise FT_Exception( error )
 
+    def load_glyphs( self, indices, flags = FT_LOAD_RENDER, bitmaps = False ):
+        '''
+        Load several glyphs in a row into the glyph slot, and collect their
+        metrics without building any intermediate Python object.
+
+        :param indices: A sequence (or numpy array) of glyph indices.
+
+        :param flags: A flag indicating what to load for these glyphs, see
+                      'load_glyph'.
+
+        :param bitmaps: If True, also pack the bitmap of every glyph into a
+                        single buffer.
+
+        :return: A numpy structured array with one record per glyph, whose
+                 fields are 'index', the fields of GlyphMetrics,
+                 'linearHoriAdvance', 'linearVertAdvance', 'advance_x',
+                 'advance_y', 'bitmap_rows', 'bitmap_width', 'bitmap_pitch',
+                 'bitmap_left', 'bitmap_top' and 'bitmap_offset'.
+
+                 If 'bitmaps' is True, a (records, data) tuple is returned
+                 instead, 'data' being a uint8 numpy array in which the
+                 bitmap of each glyph starts at 'bitmap_offset' and spans
+                 'bitmap_rows*bitmap_pitch' bytes, rows being ordered
+                 top-down ('bitmap_pitch' is then always positive).
+
+        **Note**
+
+        This method requires numpy. The glyph slot holds the last glyph of
+        the sequence on return.
+        '''
+        import numpy
+        dtype = _glyph_record_dtype()
+        start = FT_GlyphSlotRec.metrics.offset
+        size = _glyph_slot_dtype().itemsize
+        indices = numpy.asarray(indices, dtype=numpy.uint32).ravel()
+
+        # The slot is reused by FreeType for every glyph, so its fields are
+        # read back from the same address after each load.
+        slot = self._FT_Face.contents.glyph.contents
+        region = addressof(slot) + start
+        raw = bytearray(len(indices) * size)
+        chunks, offsets, offset = [], [], 0
+        face, position = self._FT_Face, 0
+        for index in indices.tolist():
+            error = FT_Load_Glyph( face, index, flags )
+            if error: raise FT_Exception( error )
+            raw[position:position + size] = string_at(region, size)
+            position += size
+            if bitmaps:
+                data = Bitmap(slot.bitmap).tobytes()
+                chunks.append(data)
+                offsets.append(offset)
+                offset += len(data)
+
+        slots = numpy.frombuffer(raw, dtype=_glyph_slot_dtype())
+        records = numpy.zeros(len(indices), dtype=dtype)
+        records['index'] = indices
+        for name in slots.dtype.names:
+            records[name] = slots[name]
+        if not bitmaps:
+            return records
+        records['bitmap_pitch'] = numpy.abs(records['bitmap_pitch'])
+        records['bitmap_offset'] = offsets
+        data = numpy.frombuffer(b''.join(chunks), dtype=numpy.uint8)
+        return records, data
+
     def load_char( self, char, flags = FT_LOAD_RENDER ):
         '''
         A function used to load a single glyph into the glyph slot of a face
@@ -1433,6 +2770,62 @@ class Face( object ):
         if error: raise FT_Exception( error )
         return padvance.value
 
+    def get_advances( self, start, count, flags ):
+        '''
+        Retrieve the advance values of several glyph outlines in an FT_Face,
+        in a single call.
+
+        :param start: The first glyph index.
+
+        :param count: The number of advance values to retrieve.
+
+        :param flags: A set of bit flags similar to those used when calling
+                      FT_Load_Glyph, see 'get_advance'.
+
+        :return: The advance values as a numpy array, in either font units
+                 or 16.16 format.
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        import numpy
+        advances = numpy.zeros(count, dtype=FT_Fixed)
+        error = FT_Get_Advances( self._FT_Face, start, count, flags,
+                                 advances.ctypes.data_as(POINTER(FT_Fixed)) )
+        if error: raise FT_Exception( error )
+        return advances
+
+    def advance_table( self, flags = FT_LOAD_DEFAULT ):
+        '''
+        Return the advance values of all the glyphs of the face, indexed by
+        glyph index, as returned by 'get_advances'.
+
+        :param flags: A set of bit flags similar to those used when calling
+                      FT_Load_Glyph, see 'get_advance'.
+
+        **Note**
+
+        The table is computed once per character size and flags, and cached
+        on the face. The returned array is read-only as it is shared between
+        callers.
+
+        This method requires numpy.
+        '''
+        key = (flags,) + self._size_key()
+        table = self._advance_tables.get(key)
+        if table is None:
+            table = self.get_advances(0, self.num_glyphs, flags)
+            table.setflags(write=False)
+            self._advance_tables[key] = table
+        return table
+
+    def _size_key( self ):
+        # Identifies the active size, for caches of size-dependent values
+        metrics = self._FT_Face.contents.size.contents.metrics
+        return (metrics.x_ppem, metrics.y_ppem,
+                metrics.x_scale, metrics.y_scale)
+
 
 
     def get_kerning( self, left, right, mode = FT_KERNING_DEFAULT ):
@@ -1461,6 +2854,253 @@ class Face( object ):
         if error: raise FT_Exception( error )
         return kerning
 
+    def get_glyph_kerning( self, left, right, mode = FT_KERNING_DEFAULT ):
+        '''
+        Return the kerning vector between two glyphs of a same face, given
+        their glyph indices.
+
+        :param left: The glyph index of the left glyph in the kern pair.
+
+        :param right: The glyph index of the right glyph in the kern pair.
+
+        :param mode: See FT_Kerning_Mode for more information. Determines the scale
+                     and dimension of the returned kerning vector.
+
+        :return: The kerning vector as a (x, y) tuple.
+        '''
+        kerning = self._kerning
+        error = FT_Get_Kerning( self._FT_Face,
+                                left, right, mode, byref(kerning) )
+        if error: raise FT_Exception( error )
+        return kerning.x, kerning.y
+
+    def kerning_table( self, glyphs, mode = FT_KERNING_DEFAULT ):
+        '''
+        Compute the kerning vectors between all the pairs of a set of glyphs.
+
+        :param glyphs: A sequence (or numpy array) of glyph indices, such as
+                       those of the characters of a text (see
+                       get_char_indices). The kerning of every pair is
+                       looked up, so the cost grows with the square of their
+                       number.
+
+        :param mode: See FT_Kerning_Mode for more information.
+
+        :return: A KerningTable holding the pairs with a non-zero kerning.
+
+        **Note**:
+
+          The last KERNING_TABLES tables are cached, per glyph set, mode
+          and character size.
+
+          This method requires numpy.
+        '''
+        import numpy
+        glyphs = numpy.unique(numpy.asarray(glyphs, dtype=numpy.int64))
+        key = (mode,) + self._size_key() + (glyphs.tobytes(),)
+        tables = self._kerning_tables
+        # Move to the most recently used end (no move_to_end on Python 2)
+        table = tables.pop(key, None)
+        if table is None:
+            lefts, rights, values = [], [], []
+            if self.has_kerning:
+                face, kerning = self._FT_Face, self._kerning
+                glyphs = glyphs.tolist()
+                for left in glyphs:
+                    for right in glyphs:
+                        error = FT_Get_Kerning( face, left, right, mode,
+                                                byref(kerning) )
+                        if error: raise FT_Exception( error )
+                        if kerning.x or kerning.y:
+                            lefts.append(left)
+                            rights.append(right)
+                            values.append((kerning.x, kerning.y))
+            table = KerningTable(self.num_glyphs, lefts, rights, values)
+        tables[key] = table
+        while len(tables) > self.KERNING_TABLES:
+            tables.popitem(last=False)
+        return table
+
+    def _get_kerning_pairs( self, pairs, mode ):
+        # Horizontal kerning of (left << 32 | right) glyph pairs, cached per
+        # character size and mode.
+        import numpy
+        cache = self._get_kerning_cache( mode )
+        pairs, inverse = numpy.unique(pairs, return_inverse=True)
+        values = [self._get_kerning_pair( cache, pair, mode )
+                  for pair in pairs.tolist()]
+        return numpy.array(values, dtype=numpy.int64)[inverse]
+
+    def _get_kerning_cache( self, mode ):
+        # The (left << 32 | right) -> horizontal kerning dict of the current
+        # character size and a mode
+        return self._kerning_pairs.setdefault((mode,) + self._size_key(), {})
+
+    def _get_kerning_pair( self, cache, pair, mode ):
+        value = cache.get(pair)
+        if value is None:
+            kerning = self._kerning
+            error = FT_Get_Kerning( self._FT_Face, pair >> 32,
+                                    pair & 0xFFFFFFFF, mode, byref(kerning) )
+            if error: raise FT_Exception( error )
+            value = cache[pair] = kerning.x
+        return value
+
+    def _get_glyph_metrics( self, indices, flags ):
+        # Advance and ink box (xMin, yMin, xMax, yMax) of glyphs, loaded on
+        # demand and cached per character size, transform and flags.
+        import numpy
+        loaded, metrics = self._get_glyph_metrics_table( flags )
+        missing = numpy.unique(indices[~loaded[indices]])
+        for index in missing.tolist():
+            self._load_glyph_metrics( index, flags, metrics )
+        loaded[missing] = True
+        return metrics
+
+    def _get_glyph_metrics_table( self, flags ):
+        # The (loaded, metrics) arrays of the current character size,
+        # transform and flags, see '_get_glyph_metrics'
+        import numpy
+        key = (flags,) + self._size_key() + (self._transform,)
+        table = self._glyph_metrics.get(key)
+        if table is None:
+            table = (numpy.zeros(self.num_glyphs, dtype=bool),
+                     numpy.zeros((self.num_glyphs, 5), dtype=numpy.int64))
+            self._glyph_metrics[key] = table
+        return table
+
+    def _load_glyph_metrics( self, index, flags, metrics ):
+        error = FT_Load_Glyph( self._FT_Face, index, flags )
+        if error: raise FT_Exception( error )
+        slot = self._FT_Face.contents.glyph.contents
+        m = slot.metrics
+        metrics[index] = (slot.advance.x, m.horiBearingX,
+                          m.horiBearingY - m.height,
+                          m.horiBearingX + m.width, m.horiBearingY)
+
+    def measure( self, text, flags = FT_LOAD_DEFAULT,
+                 kerning = FT_KERNING_DEFAULT ):
+        '''
+        Measure a line of text without rendering it.
+
+        :param text: The text, as a string.
+
+        :param flags: The flags used to load the glyphs, see 'load_glyph'.
+                      FT_LOAD_RENDER is ignored.
+
+        :param kerning: The kerning mode (see FT_Kerning_Mode), or None to
+                        disable kerning.
+
+        :return: A TextMetrics.
+
+        **Note**:
+
+          Glyph metrics are loaded once and cached on the face per character
+          size, transform and flags, and so are kerning values. Only
+          horizontal layout is supported, and the ink box is computed from
+          untransformed glyph metrics.
+
+          This method requires numpy.
+        '''
+        return self.measure_many( [text], flags, kerning )[0]
+
+    def measure_many( self, texts, flags = FT_LOAD_DEFAULT,
+                      kerning = FT_KERNING_DEFAULT ):
+        '''
+        Measure several lines of text at once, see 'measure'.
+
+        :param texts: A sequence of strings.
+
+        :return: A list of TextMetrics, in the order of texts.
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        import numpy
+        flags &= ~FT_LOAD_RENDER
+        if len(texts) == 1 and len(texts[0]) <= self._SHORT_TEXT:
+            return [self._measure_text( texts[0], flags, kerning )]
+        lengths = numpy.array([len(text) for text in texts], dtype=numpy.intp)
+        indices = self.get_char_indices(u''.join(texts)).astype(numpy.int64)
+        ends = numpy.cumsum(lengths)
+        starts = ends - lengths
+        metrics = self._get_glyph_metrics(indices, flags)[indices]
+
+        # Glyph advances, kerning with the next glyph of the same text added
+        advances = metrics[:, 0].copy()
+        if kerning is not None and self.has_kerning and len(indices) > 1:
+            within = numpy.ones(len(indices) - 1, dtype=bool)
+            within[starts[(lengths > 0) & (starts > 0)] - 1] = False
+            pairs = (indices[:-1] << 32) | indices[1:]
+            advances[:-1][within] += self._get_kerning_pairs(pairs[within],
+                                                             kerning)
+
+        # Pen position of each glyph, relative to the start of its text
+        pens = numpy.cumsum(advances) - advances
+        nonempty = lengths > 0
+        pens -= numpy.repeat(pens[starts[nonempty]], lengths[nonempty])
+
+        # Ink boxes, glyphs without ink being left out with sentinels
+        inked = (metrics[:, 3] > metrics[:, 1]) | (metrics[:, 4] > metrics[:, 2])
+        big = numpy.iinfo(numpy.int64).max
+        boxes = metrics[:, 1:].copy()
+        boxes[:, 0] += pens
+        boxes[:, 2] += pens
+        boxes[~inked, :2] = big
+        boxes[~inked, 2:] = -big
+
+        total = numpy.zeros(len(texts), dtype=numpy.int64)
+        lows = numpy.full((len(texts), 2), big, dtype=numpy.int64)
+        highs = numpy.full((len(texts), 2), -big, dtype=numpy.int64)
+        if nonempty.any():
+            first = starts[nonempty]
+            total[nonempty] = numpy.add.reduceat(advances, first)
+            lows[nonempty] = numpy.minimum.reduceat(boxes[:, :2], first)
+            highs[nonempty] = numpy.maximum.reduceat(boxes[:, 2:], first)
+
+        size = self._FT_Face.contents.size.contents.metrics
+        result = []
+        for advance, low, high in zip(total.tolist(), lows.tolist(),
+                                      highs.tolist()):
+            if low[0] == big:
+                bbox = BBox((0, 0, 0, 0))
+            else:
+                bbox = BBox((low[0], low[1], high[0], high[1]))
+            result.append(TextMetrics(advance, bbox, size.ascender,
+                                      size.descender, size.height))
+        return result
+
+    def _measure_text( self, text, flags, kerning ):
+        # measure_many for a single text, one glyph at a time
+        loaded, metrics = self._get_glyph_metrics_table( flags )
+        pairs = None
+        if kerning is not None and self.has_kerning:
+            pairs = self._get_kerning_cache( kerning )
+        codes = text.encode('utf-32-le')
+        codes = struct.unpack('<%dI' % (len(codes) // 4), codes)
+        pen, previous, box = 0, None, None
+        for code in codes:
+            index = FT_Get_Char_Index( self._FT_Face, code )
+            if not loaded[index]:
+                self._load_glyph_metrics( index, flags, metrics )
+                loaded[index] = True
+            if pairs is not None and previous is not None:
+                pen += self._get_kerning_pair( pairs, previous << 32 | index,
+                                               kerning )
+            advance, x0, y0, x1, y1 = metrics[index].tolist()
+            if x1 > x0 or y1 > y0:
+                if box is None:
+                    box = (x0 + pen, y0, x1 + pen, y1)
+                else:
+                    box = (min(box[0], x0 + pen), min(box[1], y0),
+                           max(box[2], x1 + pen), max(box[3], y1))
+            pen += advance
+            previous = index
+        size = self._FT_Face.contents.size.contents.metrics
+        return TextMetrics(pen, BBox(box or (0, 0, 0, 0)), size.ascender,
+                           size.descender, size.height)
+
     def get_format(self):
         '''
         Return a string describing the format of a given face, using values
@@ -1745,6 +3385,22 @@ class Face( object ):
 
 
 
+def _open_face( kind, value, index ):
+    # Open a face from the source recorded by Face.__init__ or from_mmap
+    if kind == 'mmap':
+        return Face.from_mmap( value, index )
+    if kind == 'buffer':
+        return Face.from_bytes( value, index )
+    return Face( value, index )
+
+def _restore_face( kind, value, index, state ):
+    # Unpickle a face, see Face.__reduce__
+    face = _open_face( kind, value, index )
+    face._set_state( state )
+    return face
+
+
+
 # -----------------------------------------------------------------------------
 #  SfntName wrapper
 # -----------------------------------------------------------------------------
@@ -2048,3 +3704,225 @@ class Stroker( object ):
         :param outline: The target outline.
         '''
         FT_Stroker_Export( self._FT_Stroker, outline._FT_Outline )
+
+
+
+# -----------------------------------------------------------------------------
+class SBit( object ):
+    '''
+    A small glyph bitmap returned by CacheManager.lookup_sbit.
+
+    This is a compact copy of a FTC_SBitRec, whose pixels are copied so that
+    the record remains valid when the cache flushes the glyph.
+    '''
+    __slots__ = ('width', 'height', 'left', 'top', 'format', 'max_grays',
+                 'pitch', 'xadvance', 'yadvance', 'buffer')
+
+    def __init__( self, sbit ):
+        '''
+        Create a new SBit object.
+
+        :param sbit: a FTC_SBitRec
+        '''
+        for name in self.__slots__[:-1]:
+            setattr(self, name, getattr(sbit, name))
+        if sbit.buffer:
+            self.buffer = string_at(sbit.buffer, sbit.height*abs(sbit.pitch))
+        else:
+            self.buffer = None
+
+
+
+# -----------------------------------------------------------------------------
+class CacheManager( object ):
+    '''
+    FTC_Manager wrapper
+
+    The FreeType cache manager owns the faces and sizes it opens, and caches
+    glyph images, small bitmaps (sbits) and charmap lookups inside FreeType
+    itself, within a memory budget.
+
+    Faces are registered with 'add_face', which returns the face ID to use
+    in lookups. The cache manager opens (and closes) the corresponding
+    FT_Face by itself, on demand.
+    '''
+
+    def __init__( self, max_faces = 0, max_sizes = 0, max_bytes = 0 ):
+        '''
+        Create a new CacheManager object.
+
+        :param max_faces: Maximum number of opened FT_Face objects managed by
+                          this cache instance. Use 0 for defaults.
+
+        :param max_sizes: Maximum number of opened FT_Size objects managed by
+                          this cache instance. Use 0 for defaults.
+
+        :param max_bytes: Maximum number of bytes to use for cached data
+                          nodes. Use 0 for defaults.
+        '''
+        self._FTC_Manager = None
+        self._sources = {}
+        self._sbit_cache = None
+        self._cmap_cache = None
+        self._image_cache = None
+        # Keep a reference to the callback as long as the manager lives
+        self._requester = FTC_Face_Requester(self._request_face)
+        manager = FTC_Manager()
+        error = FTC_Manager_New( get_handle(), max_faces, max_sizes,
+                                 max_bytes, self._requester, None,
+                                 byref(manager) )
+        if error: raise FT_Exception( error )
+        self._FTC_Manager = manager
+
+    def __del__( self ):
+        '''
+        Destroy the cache manager, with all the faces, sizes and caches it
+        manages.
+        '''
+        if self._FTC_Manager is not None:
+            FTC_Manager_Done( self._FTC_Manager )
+
+    def _request_face( self, face_id, library, request_data, aface ):
+        try:
+            source, index, is_path = self._sources[face_id]
+        except KeyError:
+            return 0x06
+        if not is_path:
+            return FT_New_Memory_Face( library, source, len(source),
+                                       index, aface )
+        return FT_New_Face( library, c_char_p(_encode_filename(source)),
+                            index, aface )
+
+    def add_face( self, source, index = 0 ):
+        '''
+        Register a face with the cache manager.
+
+        :param source: A path to the font file, or the font file contents as
+                       a bytes-like object. On Python 2, where bytes are
+                       str, pass contents as a bytearray.
+
+        :param index: The index of the face within the font.
+
+        :return: The face ID to use in lookups.
+        '''
+        # Paths are told apart from contents by type, as str is bytes on
+        # Python 2
+        is_path = isinstance(source, (str, unicode))
+        if not is_path:
+            source = bytes(source)
+        else:
+            try:
+                _encode_filename(source)
+            except UnicodeError:
+                with open(source, mode='rb') as f:
+                    source = f.read()
+                is_path = False
+        face_id = len(self._sources) + 1
+        while face_id in self._sources:
+            face_id += 1
+        self._sources[face_id] = (source, index, is_path)
+        return face_id
+
+    def remove_face( self, face_id ):
+        '''
+        Unregister a face, flushing all the cached data that depends on it.
+
+        :param face_id: The face ID returned by 'add_face'.
+        '''
+        FTC_Manager_RemoveFaceID( self._FTC_Manager, FTC_FaceID(face_id) )
+        del self._sources[face_id]
+
+    def reset( self ):
+        '''
+        Empty the cache manager: close all faces and sizes, and flush all
+        cached data. Registered faces remain registered.
+        '''
+        FTC_Manager_Reset( self._FTC_Manager )
+
+    def _new_cache( self, function ):
+        cache = c_void_p()
+        error = function( self._FTC_Manager, byref(cache) )
+        if error: raise FT_Exception( error )
+        return cache
+
+    def _image_type( self, face_id, size, flags ):
+        if isinstance(size, (tuple, list)):
+            width, height = size
+        else:
+            width = height = size
+        return FTC_ImageTypeRec( FTC_FaceID(face_id), width, height, flags )
+
+    def get_char_index( self, face_id, charcode, cmap_index = -1 ):
+        '''
+        Return the glyph index of a character code, through the charmap
+        cache.
+
+        :param face_id: The face ID returned by 'add_face'.
+
+        :param charcode: The character code.
+
+        :param cmap_index: The index of the charmap in the face; -1 selects
+                           the face's default (Unicode) charmap.
+
+        :return: The glyph index, 0 standing for the 'missing glyph'.
+        '''
+        if self._cmap_cache is None:
+            self._cmap_cache = self._new_cache( FTC_CMapCache_New )
+        if isinstance(charcode, (str,unicode)):
+            charcode = ord(charcode)
+        return FTC_CMapCache_Lookup( self._cmap_cache, FTC_FaceID(face_id),
+                                     cmap_index, charcode )
+
+    def lookup_sbit( self, face_id, glyph_index, size, flags = FT_LOAD_DEFAULT ):
+        '''
+        Return a small bitmap of a glyph, through the sbit cache.
+
+        :param face_id: The face ID returned by 'add_face'.
+
+        :param glyph_index: The glyph index.
+
+        :param size: The character size in pixels, as a single value or a
+                     (width, height) tuple.
+
+        :param flags: The load flags, as in Face.load_glyph. FT_LOAD_RENDER
+                      is always implied.
+
+        :return: A SBit. Its 'buffer' is None when the glyph is too large to
+                 be cached as a small bitmap; use 'lookup_glyph' then.
+        '''
+        if self._sbit_cache is None:
+            self._sbit_cache = self._new_cache( FTC_SBitCache_New )
+        image_type = self._image_type( face_id, size, flags )
+        sbit = FTC_SBit()
+        error = FTC_SBitCache_Lookup( self._sbit_cache, byref(image_type),
+                                      glyph_index, byref(sbit), None )
+        if error: raise FT_Exception( error )
+        return SBit( sbit.contents )
+
+    def lookup_glyph( self, face_id, glyph_index, size, flags = FT_LOAD_DEFAULT ):
+        '''
+        Return a glyph image, through the image cache.
+
+        :param face_id: The face ID returned by 'add_face'.
+
+        :param glyph_index: The glyph index.
+
+        :param size: The character size in pixels, as a single value or a
+                     (width, height) tuple.
+
+        :param flags: The load flags, as in Face.load_glyph.
+
+        :return: A Glyph, which is a copy of the cached glyph image.
+        '''
+        if self._image_cache is None:
+            self._image_cache = self._new_cache( FTC_ImageCache_New )
+        image_type = self._image_type( face_id, size, flags )
+        aglyph = FT_Glyph()
+        error = FTC_ImageCache_Lookup( self._image_cache, byref(image_type),
+                                       glyph_index, byref(aglyph), None )
+        if error: raise FT_Exception( error )
+        # The cached glyph belongs to the cache and may be flushed anytime
+        glyph = FT_Glyph()
+        error = FT_Glyph_Copy( aglyph, byref(glyph) )
+        if error: raise FT_Exception( error )
+        return Glyph( glyph )
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+#
+#  FreeType high-level python API - Copyright 2011-2015 Nicolas P. Rougier
+#  Distributed under the terms of the new BSD license.
+#
+# -----------------------------------------------------------------------------
+'''
+asyncio rendering
+
+An AsyncRenderer renders and measures text from coroutines without blocking
+the event loop: the work runs on the threads of a ThreadRenderer, each with
+its own faces. At most 'max_pending' requests run or wait in the executor at
+once, further callers being suspended until a slot frees up, and concurrent
+identical requests are computed once.
+
+**Note** This module requires Python 3.7 and numpy.
+'''
+import asyncio
+
+from freetype import FT_LOAD_RENDER, FT_LOAD_DEFAULT, FT_KERNING_DEFAULT
+from freetype.parallel import ThreadRenderer
+
+
+def _render(state, request):
+    text, flags, kerning, phases = request
+    return state.chain.render_text(text, flags, kerning, phases)
+
+
+def _measure(state, request):
+    text, flags, kerning = request
+    return state.chain.measure(text, flags, kerning)
+
+
+class AsyncRenderer(object):
+    '''
+    Renders and measures lines of text for asyncio code, see ThreadRenderer.
+
+    Results may be shared by concurrent callers making identical requests,
+    and must not be modified.
+    '''
+
+    def __init__(self, fonts, size=16 * 64, resolution=72, workers=None,
+                 max_pending=None, cache_bytes=16 * 1024 * 1024):
+        '''
+        Create a new AsyncRenderer object.
+
+        :param fonts: A font, or a sequence of fonts by order of preference,
+                      see ThreadRenderer.
+
+        :param size: The character size, in 26.6 fractional points.
+
+        :param resolution: The horizontal and vertical resolution, in dpi.
+
+        :param workers: The number of threads, one per CPU if None.
+
+        :param max_pending: The number of requests handed to the threads at
+                            once, twice the number of threads if None.
+
+        :param cache_bytes: The budget of the GlyphCache of each thread.
+        '''
+        self._threads = ThreadRenderer(fonts, size, resolution, workers,
+                                       cache_bytes)
+        self.max_pending = max_pending or 2 * self._threads.workers
+        # Created on first use, within the event loop
+        self._slots = None
+        # Request -> future of the running computation
+        self._pending = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def _run(self, function, request):
+        key = (function, request)
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._execute(function, request))
+            self._pending[key] = future
+
+            def done(future):
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+            future.add_done_callback(done)
+        # A cancelled caller does not cancel the other callers' computation
+        return await asyncio.shield(future)
+
+    async def _execute(self, function, request):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._threads._executor,
+                                              self._threads._call, function,
+                                              request)
+
+    async def render_text(self, text, flags=FT_LOAD_RENDER,
+                          kerning=FT_KERNING_DEFAULT, phases=1):
+        '''
+        Render a line of text, see freetype.text.render_text.
+
+        :return: image, left, top.
+        '''
+        return await self._run(_render, (text, flags, kerning, phases))
+
+    async def measure(self, text, flags=FT_LOAD_DEFAULT,
+                      kerning=FT_KERNING_DEFAULT):
+        '''
+        Measure a line of text, see FontChain.measure.
+
+        :return: A TextMetrics.
+        '''
+        return await self._run(_measure, (text, flags, kerning))
+
+    def close(self):
+        '''
+        Wait for the running requests and stop the threads, see
+        ThreadRenderer.close. This blocks, use 'async with' from coroutines.
+        '''
+        self._threads.close()
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+#
+#  FreeType high-level python API - Copyright 2011-2015 Nicolas P. Rougier
+#  Distributed under the terms of the new BSD license.
+#
+# -----------------------------------------------------------------------------
+'''
+Glyph atlas
+
+Packs glyph bitmaps into a single numpy array, suitable for upload as a
+texture. Regions are allocated with a skyline bottom-left strategy: each
+region is placed as low as possible (lowest row index), then as far left as
+possible. See Jukka Jylänki, "A Thousand Ways to Pack the Bin - A Practical
+Approach to Two-Dimensional Rectangle Bin Packing", February 27, 2010.
+
+**Note** This module requires numpy.
+'''
+from freetype import FT_LOAD_RENDER
+
+
+class AtlasGlyph(object):
+    '''
+    A glyph packed into an Atlas.
+    '''
+
+    __slots__ = ('index', 'region', 'uv', 'left', 'top', 'advance')
+
+    def __init__(self, index, region, uv, left, top, advance):
+        '''
+        Create a new AtlasGlyph object.
+
+        :param index: The glyph index.
+
+        :param region: The (x, y, width, height) region of the atlas holding
+                       the glyph bitmap, in pixels.
+
+        :param uv: The (u0, v0, u1, v1) normalized texture coordinates of the
+                   region.
+
+        :param left: The left bearing of the bitmap, in integer pixels.
+
+        :param top: The top bearing of the bitmap, in integer pixels (upwards
+                    y).
+
+        :param advance: The (x, y) advance of the glyph, in 26.6 fractional
+                        pixels.
+        '''
+        self.index = index
+        self.region = region
+        self.uv = uv
+        self.left = left
+        self.top = top
+        self.advance = advance
+
+
+class Atlas(object):
+    '''
+    A numpy-backed texture atlas, filled incrementally.
+    '''
+
+    def __init__(self, width=1024, height=1024, depth=1, padding=1):
+        '''
+        Create a new Atlas object.
+
+        :param width: Width of the atlas, in pixels.
+
+        :param height: Height of the atlas, in pixels.
+
+        :param depth: Number of channels per pixel (1 for gray, 3 for LCD
+                      or RGB, 4 for BGRA).
+
+        :param padding: Number of empty pixels kept on the right of and
+                        below each region, so that texture filtering does not
+                        bleed between neighbouring glyphs.
+        '''
+        import numpy
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.padding = padding
+        self.data = numpy.zeros((height, width, depth), dtype=numpy.ubyte)
+        self.used = 0
+        # Skyline: for each column, the first row that is still free
+        self._skyline = numpy.zeros(width, dtype=numpy.int32)
+
+    @property
+    def fill_ratio(self):
+        '''
+        Fraction of the atlas pixels covered by allocated regions, padding
+        excluded.
+        '''
+        return self.used / float(self.width * self.height)
+
+    def uv(self, region):
+        '''
+        Return the normalized (u0, v0, u1, v1) texture coordinates of a
+        region.
+
+        :param region: A (x, y, width, height) region.
+        '''
+        x, y, width, height = region
+        return (x / float(self.width), y / float(self.height),
+                (x + width) / float(self.width),
+                (y + height) / float(self.height))
+
+    def allocate(self, width, height):
+        '''
+        Allocate a region of the atlas.
+
+        :param width: Width of the region, in pixels.
+
+        :param height: Height of the region, in pixels.
+
+        :return: The (x, y, width, height) region, or None if the atlas is
+                 full.
+        '''
+        import numpy
+        w = width + self.padding
+        h = height + self.padding
+        count = self.width - w + 1
+        if count <= 0:
+            return None
+        # Highest skyline row over each window of w columns, by doubling
+        top = self._skyline.copy()
+        span = 1
+        while span < w:
+            step = min(span, w - span)
+            numpy.maximum(top[:-step], top[step:], out=top[:-step])
+            span += step
+        x = int(top[:count].argmin())
+        y = int(top[x])
+        if y + h > self.height:
+            return None
+        self._skyline[x:x + w] = y + h
+        self.used += width * height
+        return x, y, width, height
+
+    def _as_array(self, data):
+        import numpy
+        if hasattr(data, 'to_numpy'):
+            data = data.to_numpy()
+        data = numpy.asarray(data)
+        if data.dtype == numpy.bool_:
+            data = data * numpy.ubyte(255)
+        if data.ndim == 2:
+            data = data[..., numpy.newaxis]
+        if data.ndim != 3 or data.shape[2] != self.depth:
+            raise ValueError('data of shape %r does not match an atlas '
+                             'depth of %d' % (data.shape, self.depth))
+        return data
+
+    def add(self, data):
+        '''
+        Allocate a region and copy data into it.
+
+        :param data: A Bitmap, or an array of shape (rows, width) or (rows,
+                     width, depth).
+
+        :return: The (x, y, width, height) region, or None if the atlas is
+                 full.
+        '''
+        data = self._as_array(data)
+        height, width = data.shape[:2]
+        region = self.allocate(width, height)
+        if region is not None:
+            x, y = region[:2]
+            self.data[y:y + height, x:x + width] = data
+        return region
+
+    def add_many(self, items):
+        '''
+        Add several bitmaps at once. Bitmaps are packed tallest first, which
+        gives a much tighter packing than insertion order.
+
+        :param items: A sequence of Bitmap objects or arrays, as in 'add'.
+                      Bitmaps must not be owned by a glyph slot that is
+                      reloaded in between (see Bitmap.copy).
+
+        :return: The list of regions, in the order of items. Items that did
+                 not fit have a None region.
+        '''
+        arrays = [self._as_array(item) for item in items]
+        order = sorted(range(len(arrays)),
+                       key=lambda i: (-arrays[i].shape[0], -arrays[i].shape[1]))
+        regions = [None] * len(arrays)
+        for i in order:
+            regions[i] = self.add(arrays[i])
+        return regions
+
+    def add_glyphs(self, face, indices, flags=FT_LOAD_RENDER):
+        '''
+        Render glyphs from a face and pack them.
+
+        :param face: A Face, with its character size already set.
+
+        :param indices: A sequence of glyph indices.
+
+        :param flags: The load flags, as in Face.load_glyph. FT_LOAD_RENDER
+                      should be part of them.
+
+        :return: The list of AtlasGlyph objects, in the order of indices.
+                 Glyphs that did not fit have a None region and uv.
+        '''
+        indices = [int(index) for index in indices]
+        slot = face.glyph
+        arrays, metrics = [], []
+        for index in indices:
+            face.load_glyph(index, flags)
+            arrays.append(slot.bitmap.to_numpy(copy=True))
+            advance = slot.advance
+            metrics.append((slot.bitmap_left, slot.bitmap_top,
+                            (advance.x, advance.y)))
+        regions = self.add_many(arrays)
+        glyphs = []
+        for index, region, (left, top, advance) in zip(indices, regions,
+                                                       metrics):
+            uv = self.uv(region) if region is not None else None
+            glyphs.append(AtlasGlyph(index, region, uv, left, top, advance))
+        return glyphs
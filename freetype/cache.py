@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+#
+#  FreeType high-level python API - Copyright 2011-2015 Nicolas P. Rougier
+#  Distributed under the terms of the new BSD license.
+#
+# -----------------------------------------------------------------------------
+'''
+Glyph cache
+
+A memory-bounded LRU cache of rendered glyphs. Glyphs are rendered through
+a Face and kept as detached bitmaps together with their bearings and
+advance, so that they can be reused without touching FreeType again.
+
+Glyphs can also be cached at subpixel horizontal offsets, for accurate
+spacing: pen positions are quantized into a few phases, and each glyph is
+rendered once per phase.
+'''
+from collections import OrderedDict
+
+from freetype import FT_LOAD_RENDER, FT_LOAD_MONOCHROME, \
+    FT_GLYPH_FORMAT_OUTLINE, FT_RENDER_MODE_MONO
+
+
+class CachedGlyph(object):
+    '''
+    A rendered glyph detached from the face it was loaded from.
+    '''
+
+    __slots__ = ('index', 'bitmap', 'left', 'top', 'advance', 'nbytes',
+                 '_array')
+
+    def __init__(self, index, bitmap, left, top, advance):
+        '''
+        Create a new CachedGlyph object.
+
+        :param index: The glyph index.
+
+        :param bitmap: A Bitmap owning its data (see Bitmap.copy).
+
+        :param left: The left bearing of the bitmap, in integer pixels.
+
+        :param top: The top bearing of the bitmap, in integer pixels (upwards
+                    y).
+
+        :param advance: The (x, y) advance of the glyph, in 26.6 fractional
+                        pixels.
+        '''
+        self.index = index
+        self.bitmap = bitmap
+        self.left = left
+        self.top = top
+        self.advance = advance
+        self.nbytes = bitmap.rows * abs(bitmap.pitch)
+        self._array = None
+
+    def to_numpy(self):
+        '''
+        Return the bitmap as a numpy array, see Bitmap.to_numpy. The array is
+        computed once and kept with the glyph, so it must not be modified.
+
+        **Note**
+
+        This method requires numpy.
+        '''
+        if self._array is None:
+            self._array = self.bitmap.to_numpy()
+        return self._array
+
+    @classmethod
+    def from_slot(cls, index, slot):
+        '''
+        Create a CachedGlyph from the glyph currently loaded in a GlyphSlot.
+        '''
+        advance = slot.advance
+        return cls(index, slot.bitmap.copy(), slot.bitmap_left,
+                   slot.bitmap_top, (advance.x, advance.y))
+
+
+class GlyphCache(object):
+    '''
+    A cache of rendered glyphs, keyed by face, character size, glyph index,
+    load flags and transform.
+
+    The cache holds at most 'max_bytes' bytes of bitmap data; the least
+    recently used glyphs are evicted first once the budget is exceeded.
+    '''
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        '''
+        Create a new GlyphCache object.
+
+        :param max_bytes: The budget of bitmap data, in bytes.
+        '''
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._glyphs = OrderedDict()
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def key(self, face, index, flags=FT_LOAD_RENDER, offset=0):
+        '''
+        Return the key under which a glyph is cached.
+        '''
+        return (face, face._size_key(), face._transform, index, flags, offset)
+
+    def get(self, face, index, flags=FT_LOAD_RENDER, offset=0):
+        '''
+        Return the CachedGlyph of a glyph, rendering it through the face if
+        it is not in the cache yet.
+
+        :param face: The Face to load the glyph from, at its current size
+                     and transform.
+
+        :param index: The glyph index.
+
+        :param flags: The flags used to load the glyph, see Face.load_glyph.
+
+        :param offset: A horizontal offset, in 26.6 fractional pixels, by
+                       which the outline is translated before it is
+                       rendered. Bitmap glyphs are not translated.
+        '''
+        key = self.key(face, index, flags, offset)
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self.hits += 1
+            # Move to the most recently used end (no move_to_end on Python 2)
+            self._glyphs[key] = self._glyphs.pop(key)
+            return glyph
+        self.misses += 1
+        slot = face.glyph
+        if offset and flags & FT_LOAD_RENDER:
+            face.load_glyph(index, flags & ~FT_LOAD_RENDER)
+            if slot.format == FT_GLYPH_FORMAT_OUTLINE:
+                slot.outline.translate(offset, 0)
+            if flags & FT_LOAD_MONOCHROME:
+                slot.render(FT_RENDER_MODE_MONO)
+            else:
+                slot.render((flags >> 16) & 15)
+        else:
+            face.load_glyph(index, flags)
+        glyph = CachedGlyph.from_slot(index, slot)
+        self.put(key, glyph)
+        return glyph
+
+    def place(self, face, index, x, flags=FT_LOAD_RENDER, phases=4):
+        '''
+        Return the CachedGlyph of a glyph drawn at a fractional pen position,
+        see 'get'.
+
+        The fractional part of the position is rounded to one of 'phases'
+        evenly spaced offsets, so that at most 'phases' variants of each
+        glyph are rendered. Hinting should be disabled (FT_LOAD_NO_HINTING)
+        or kept light (FT_LOAD_TARGET_LIGHT) for the variants to be
+        consistent.
+
+        :param x: The horizontal pen position, in 26.6 fractional pixels.
+
+        :param phases: The number of subpixel phases.
+
+        :return: glyph, x where x is the integer pen position, in pixels, at
+                 which the glyph bitmap must be drawn (its left bearing still
+                 has to be added).
+        '''
+        pixel, phase = divmod((x * phases + 32) // 64, phases)
+        glyph = self.get(face, index, flags, phase * 64 // phases)
+        return glyph, pixel
+
+    def get_char(self, face, char, flags=FT_LOAD_RENDER):
+        '''
+        Return the CachedGlyph of a character, see 'get'.
+        '''
+        return self.get(face, face.get_char_index(char), flags)
+
+    def put(self, key, glyph):
+        '''
+        Store a glyph in the cache, evicting older glyphs as needed.
+        '''
+        previous = self._glyphs.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous.nbytes
+        self._glyphs[key] = glyph
+        self.nbytes += glyph.nbytes
+        while self.nbytes > self.max_bytes and len(self._glyphs) > 1:
+            _, evicted = self._glyphs.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        '''
+        Remove all glyphs from the cache. Statistics are kept.
+        '''
+        self._glyphs.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        '''
+        Return the statistics of the cache as a dict.
+        '''
+        lookups = self.hits + self.misses
+        return {'glyphs': len(self._glyphs), 'nbytes': self.nbytes,
+                'max_bytes': self.max_bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'hit_ratio': float(self.hits) / lookups if lookups else 0.0}
@@ -46,6 +46,8 @@ FT_Size: FreeType root size class structure.
 
 FT_Face: FreeType root face class structure.
 
+FT_StreamRec: A structure used to describe an input stream.
+
 FT_Parameter: A simple structure used to pass more or less generic parameters
               to FT_Open_Face.
 
@@ -57,6 +59,14 @@ FT_SfntName: A structure used to model an SFNT 'name' table entry.
 FT_Stroker: Opaque handler to a path stroker object.
 
 FT_BitmapGlyph: A structure used for bitmap glyph images.
+
+FTC_ScalerRec: A structure used to describe a given character size to the
+               cache manager.
+
+FTC_ImageTypeRec: A structure used to model the type of images in a glyph
+                  cache.
+
+FTC_SBitRec: A very compact structure used to describe a small glyph bitmap.
 '''
 from freetype.ft_types import *
 
@@ -864,6 +874,77 @@ FT_Face = POINTER(FT_FaceRec)
 
 
 
+# -----------------------------------------------------------------------------
+# A union type used to store either a long or a pointer. This is used to store
+# a file descriptor or a 'FILE*' in an input stream.
+class FT_StreamDesc(Union):
+    '''
+    A union type used to store either a long or a pointer. This is used to
+    store a file descriptor or a 'FILE*' in an input stream.
+    '''
+    _fields_ = [
+        ('value',   c_long),
+        ('pointer', c_void_p) ]
+
+
+
+# -----------------------------------------------------------------------------
+# A structure used to describe an input stream.
+class FT_StreamRec(Structure):
+    '''
+    A structure used to describe an input stream.
+
+    base: For memory-based streams, this is the address of the first stream
+          byte in memory. This field should always be set to NULL for
+          disk-based streams.
+
+    size: The stream size in bytes.
+
+    pos: The current position within the stream.
+
+    descriptor: This field is a union that can hold an integer or a pointer.
+                It is used by stream implementations to store file
+                descriptors or 'FILE*' pointers.
+
+    pathname: This field is completely ignored by FreeType. However, it is
+              often useful during debugging to use it to store the stream's
+              filename (where available).
+
+    read: The stream's input function.
+
+    close: The stream's close function.
+
+    memory: The memory manager to use to preload frames. This is set
+            internally by FreeType and shouldn't be touched by stream
+            implementations.
+
+    cursor: This field is set and used internally by FreeType when parsing
+            frames.
+
+    limit: This field is set and used internally by FreeType when parsing
+           frames.
+    '''
+FT_Stream = POINTER(FT_StreamRec)
+
+# Read 'count' bytes at 'offset' into 'buffer' and return the number of bytes
+# read; a 'count' of 0 is a seek, which returns 0 on success.
+FT_Stream_IoFunc = CFUNCTYPE(c_ulong, FT_Stream, c_ulong, c_void_p, c_ulong)
+FT_Stream_CloseFunc = CFUNCTYPE(None, FT_Stream)
+
+FT_StreamRec._fields_ = [
+        ('base',       POINTER(c_ubyte)),
+        ('size',       c_ulong),
+        ('pos',        c_ulong),
+        ('descriptor', FT_StreamDesc),
+        ('pathname',   FT_StreamDesc),
+        ('read',       FT_Stream_IoFunc),
+        ('close',      FT_Stream_CloseFunc),
+        ('memory',     c_void_p),
+        ('cursor',     POINTER(c_ubyte)),
+        ('limit',      POINTER(c_ubyte)) ]
+
+
+
 # -----------------------------------------------------------------------------
 # A simple structure used to pass more or less generic parameters to
 # FT_Open_Face.
@@ -983,3 +1064,123 @@ class FT_BitmapGlyphRec(Structure):
         ('bitmap', FT_Bitmap)
     ]
 FT_BitmapGlyph = POINTER(FT_BitmapGlyphRec)
+
+
+
+# -----------------------------------------------------------------------------
+# Opaque handles to the cache manager and to the caches it manages. Face IDs
+# are opaque pointers chosen by the client to identify faces.
+FTC_Manager    = c_void_p
+FTC_Node       = c_void_p
+FTC_ImageCache = c_void_p
+FTC_SBitCache  = c_void_p
+FTC_CMapCache  = c_void_p
+FTC_FaceID     = c_void_p
+
+# Callback used by the cache manager to translate face IDs into new FT_Face
+# objects.
+FTC_Face_Requester = CFUNCTYPE(FT_Error, FTC_FaceID, FT_Library, FT_Pointer,
+                               POINTER(FT_Face))
+
+
+
+# -----------------------------------------------------------------------------
+# A structure used to describe a given character size in either pixels or
+# points to the cache manager.
+class FTC_ScalerRec(Structure):
+    '''
+    A structure used to describe a given character size in either pixels or
+    points to the cache manager.
+
+    face_id: The source face ID.
+
+    width: The character width.
+
+    height: The character height.
+
+    pixel: A Boolean. If 1, the 'width' and 'height' fields are interpreted as
+           integer pixel character sizes. Otherwise, they are expressed as
+           1/64th of points.
+
+    x_res: Only used when 'pixel' is value 0 to indicate the horizontal
+           resolution in dpi.
+
+    y_res: Only used when 'pixel' is value 0 to indicate the vertical
+           resolution in dpi.
+    '''
+    _fields_ = [
+        ('face_id', FTC_FaceID),
+        ('width',   FT_UInt),
+        ('height',  FT_UInt),
+        ('pixel',   FT_Int),
+        ('x_res',   FT_UInt),
+        ('y_res',   FT_UInt) ]
+FTC_Scaler = POINTER(FTC_ScalerRec)
+
+
+
+# -----------------------------------------------------------------------------
+# A structure used to model the type of images in a glyph cache.
+class FTC_ImageTypeRec(Structure):
+    '''
+    A structure used to model the type of images in a glyph cache.
+
+    face_id: The face ID.
+
+    width: The width in pixels.
+
+    height: The height in pixels.
+
+    flags: The load flags, as in FT_Load_Glyph.
+    '''
+    _fields_ = [
+        ('face_id', FTC_FaceID),
+        ('width',   FT_UInt),
+        ('height',  FT_UInt),
+        ('flags',   FT_Int32) ]
+FTC_ImageType = POINTER(FTC_ImageTypeRec)
+
+
+
+# -----------------------------------------------------------------------------
+# A very compact structure used to describe a small glyph bitmap.
+class FTC_SBitRec(Structure):
+    '''
+    A very compact structure used to describe a small glyph bitmap.
+
+    width: The bitmap width in pixels.
+
+    height: The bitmap height in pixels.
+
+    left: The horizontal distance from the pen position to the left bitmap
+          border (a.k.a. 'left side bearing', or 'lsb').
+
+    top: The vertical distance from the pen position (on the baseline) to the
+         upper bitmap border (a.k.a. 'top side bearing'). The distance is
+         positive for upwards y coordinates.
+
+    format: The format of the glyph bitmap (monochrome or gray).
+
+    max_grays: Maximum gray level value (in the range 1 to 255).
+
+    pitch: The number of bytes per bitmap line. May be positive or negative.
+
+    xadvance: The horizontal advance width in pixels.
+
+    yadvance: The vertical advance height in pixels.
+
+    buffer: A pointer to the bitmap pixels.
+    '''
+    _fields_ = [
+        ('width',     FT_Byte),
+        ('height',    FT_Byte),
+        # FT_Char is signed here, which c_char (bytes) cannot express
+        ('left',      c_byte),
+        ('top',       c_byte),
+        ('format',    FT_Byte),
+        ('max_grays', FT_Byte),
+        ('pitch',     FT_Short),
+        ('xadvance',  c_byte),
+        ('yadvance',  c_byte),
+        ('buffer',    POINTER(FT_Byte)) ]
+FTC_SBit = POINTER(FTC_SBitRec)
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+#
+#  FreeType high-level python API - Copyright 2011-2015 Nicolas P. Rougier
+#  Distributed under the terms of the new BSD license.
+#
+# -----------------------------------------------------------------------------
+'''
+Font index
+
+A persistent catalog of the faces found in font directories. Font files are
+opened in a process pool, every face of collections is described (names,
+flags, sfnt names and Unicode coverage), and the result is saved as a
+compressed JSON file. Rescanning only reopens the files whose modification
+time or size changed.
+
+**Note** This module requires Python 3 and numpy.
+'''
+import bisect
+import gzip
+import json
+import os
+import tempfile
+
+from freetype import Face, FT_Exception
+
+
+# Extensions of the files scanned by default
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc', '.otc', '.pfb', '.pfa', '.pcf',
+                   '.bdf', '.fon', '.fnt', '.woff', '.woff2', '.dfont')
+
+# Bumped whenever the layout of the saved records changes
+_FORMAT = 1
+
+
+def _decode_sfnt_name(name):
+    if name.platform_id in (0, 3):
+        return name.string.decode('utf-16-be', 'replace')
+    if name.platform_id == 1 and name.encoding_id == 0:
+        return name.string.decode('mac_roman', 'replace')
+    return name.string.decode('latin-1')
+
+
+def describe_face(face):
+    '''
+    Return the record describing a face, as stored in a FontIndex.
+
+    :param face: A Face.
+
+    :return: A dict with the face 'index', 'family', 'style', 'postscript'
+             name, 'face_flags', 'style_flags', 'num_glyphs', 'names' (the
+             sfnt names as [platform_id, encoding_id, language_id, name_id,
+             text] lists) and 'coverage' (the character codes of the Unicode
+             charmap, as a flat list of [start, stop) pairs).
+    '''
+    def text(value):
+        return value.decode('utf-8', 'replace') if value else None
+    names = []
+    for i in range(face.sfnt_name_count):
+        try:
+            name = face.get_sfnt_name(i)
+        except FT_Exception:
+            continue
+        names.append([name.platform_id, name.encoding_id, name.language_id,
+                      name.name_id, _decode_sfnt_name(name)])
+    return {'index': face._index,
+            'family': text(face.family_name),
+            'style': text(face.style_name),
+            'postscript': text(face.postscript_name),
+            'face_flags': face.face_flags,
+            'style_flags': face.style_flags,
+            'num_glyphs': face.num_glyphs,
+            'names': names,
+            'coverage': face.coverage().ranges.ravel().tolist()}
+
+
+def scan_file(path):
+    '''
+    Return the records of all the faces of a font file, an empty list if
+    FreeType cannot open it, or None if it failed otherwise (e.g., the file
+    could not be read).
+    '''
+    records = []
+    try:
+        face = Face(path)
+        records.append(describe_face(face))
+        for index in range(1, face.num_faces):
+            records.append(describe_face(Face(path, index)))
+    except FT_Exception:
+        pass
+    except Exception:
+        # Not raised, so that a single file cannot abort a whole scan
+        return None
+    return records
+
+
+class FontIndex(object):
+    '''
+    A catalog of the faces of a set of font files, which can be saved to and
+    loaded from disk.
+    '''
+
+    def __init__(self, path=None):
+        '''
+        Create a new FontIndex object.
+
+        :param path: The file the index is saved to. It is loaded if it
+                     exists (and was written by a compatible version).
+        '''
+        self.path = path
+        # Font file path -> (mtime_ns, size, face records)
+        self.files = {}
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return sum(len(records) for _, _, records in self.files.values())
+
+    def __iter__(self):
+        '''
+        Iterate over (font file path, face record) pairs.
+        '''
+        for path, (_, _, records) in self.files.items():
+            for record in records:
+                yield path, record
+
+    def load(self, path=None):
+        '''
+        Load the index from a file, replacing its contents.
+        '''
+        path = path or self.path
+        with gzip.open(path, 'rt') as f:
+            data = json.load(f)
+        if data.get('format') != _FORMAT:
+            self.files = {}
+            return
+        self.files = dict((entry[0], tuple(entry[1:]))
+                          for entry in data['files'])
+
+    def save(self, path=None):
+        '''
+        Save the index to a file. The file is replaced atomically.
+        '''
+        path = path or self.path
+        files = [[name, mtime, size, records]
+                 for name, (mtime, size, records) in sorted(self.files.items())]
+        descriptor, temporary = tempfile.mkstemp(
+            suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(descriptor, 'wb') as raw:
+                with gzip.open(raw, 'wt') as f:
+                    json.dump({'format': _FORMAT, 'files': files}, f,
+                              separators=(',', ':'))
+            # mkstemp creates the file readable by its owner only: keep the
+            # permissions of the file it replaces, or use the umask default
+            try:
+                mode = os.stat(path).st_mode & 0o777
+            except OSError:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            os.chmod(temporary, mode)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def scan(self, directories, extensions=FONT_EXTENSIONS, processes=None):
+        '''
+        Scan directories (recursively) for font files, and update the index.
+
+        Files whose modification time and size did not change are not
+        reopened, and the files that are no longer found in the directories
+        are dropped, as are those that failed to be scanned (see scan_file),
+        until the next scan.
+
+        :param directories: A directory or a sequence of directories.
+
+        :param extensions: The file extensions (lower case) of the files to
+                           scan.
+
+        :param processes: The number of worker processes; None uses one per
+                          CPU, 0 scans in the current process.
+
+        :return: The number of files that were (re)scanned.
+        '''
+        if isinstance(directories, str):
+            directories = [directories]
+        found = {}
+        for directory in directories:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    if os.path.splitext(name)[1].lower() not in extensions:
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    found[path] = (stat.st_mtime_ns, stat.st_size)
+
+        files = {}
+        stale = []
+        for path, (mtime, size) in found.items():
+            known = self.files.get(path)
+            if known is not None and known[:2] == (mtime, size):
+                files[path] = known
+            else:
+                stale.append(path)
+
+        if processes == 0 or len(stale) < 2:
+            scanned = [scan_file(path) for path in stale]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            workers = processes or os.cpu_count() or 1
+            chunksize = max(1, len(stale) // (4 * workers))
+            with ProcessPoolExecutor(workers) as executor:
+                scanned = list(executor.map(scan_file, stale,
+                                            chunksize=chunksize))
+        for path, records in zip(stale, scanned):
+            if records is not None:
+                files[path] = found[path] + (records,)
+        self.files = files
+        return len(stale)
+
+    def find(self, family=None, style=None, char=None):
+        '''
+        Return the (font file path, face record) pairs matching all the given
+        criteria.
+
+        :param family: The family name, compared case-insensitively.
+
+        :param style: The style name, compared case-insensitively.
+
+        :param char: A character (or character code) the face must cover.
+        '''
+        if isinstance(char, str):
+            char = ord(char)
+        family = family and family.lower()
+        style = style and style.lower()
+        matches = []
+        for path, record in self:
+            if family and (record['family'] or '').lower() != family:
+                continue
+            if style and (record['style'] or '').lower() != style:
+                continue
+            if char is not None and not _covers(record['coverage'], char):
+                continue
+            matches.append((path, record))
+        return matches
+
+
+def _covers(ranges, code):
+    # Binary search of the [start, stop) pairs of a flat range list
+    position = bisect.bisect_right(ranges, code)
+    return position % 2 == 1
@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+#
+#  FreeType high-level python API - Copyright 2011-2015 Nicolas P. Rougier
+#  Distributed under the terms of the new BSD license.
+#
+# -----------------------------------------------------------------------------
+'''
+Parallel rendering
+
+FreeType objects must not be used from several threads at once, but a
+library and the faces created in it are independent from other libraries.
+A ThreadRenderer gives each of its worker threads its own FT_Library, faces
+and glyph cache. The font files are read once, and all the faces of a font
+are opened in place from the same memory buffer, through FT_New_Memory_Face.
+ctypes releases the GIL during FreeType calls, so glyphs are rasterized in
+parallel.
+
+A ProcessRenderer does the same with a pool of processes, for batch jobs.
+Faces cannot be pickled, so workers reopen the fonts from descriptors: font
+files are memory-mapped, and fonts given as bytes are copied once into
+shared memory. Rendered images are written straight into a SharedCanvas, a
+shared memory block, and are never sent back through pickling. They
+require Python 3.8 (multiprocessing.shared_memory).
+
+**Note** This module requires Python 3 (concurrent.futures) and numpy.
+'''
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from freetype import Face, FT_LOAD_RENDER, FT_LOAD_DEFAULT, \
+    FT_KERNING_DEFAULT, _new_library
+from freetype.raw import FT_Done_Face, FT_Done_FreeType
+from freetype.cache import GlyphCache
+from freetype.text import FontChain
+
+
+def _load_fonts(fonts):
+    # (buffer, index) pairs of a font or a sequence of fonts, files being
+    # read once
+    if isinstance(fonts, (str, bytes, bytearray, memoryview, tuple)):
+        fonts = [fonts]
+    loaded = []
+    for font in fonts:
+        source, index = font if isinstance(font, tuple) else (font, 0)
+        if isinstance(source, str):
+            with open(source, mode='rb') as f:
+                source = f.read()
+        loaded.append((source, index))
+    return loaded
+
+
+class _Worker(object):
+    # The FreeType state of a worker thread
+    def __init__(self, fonts, size, resolution, cache_bytes):
+        self.library = _new_library()
+        self.faces = []
+        for source, index in fonts:
+            face = Face.from_bytes(source, index, self.library)
+            face.set_char_size(size, size, resolution, resolution)
+            self.faces.append(face)
+        self.cache = GlyphCache(cache_bytes)
+        self.chain = FontChain(self.faces, self.cache)
+
+    def close(self):
+        # Faces first, then the library they belong to
+        for face in self.faces:
+            if face._FT_Face is not None:
+                FT_Done_Face(face._FT_Face)
+                face._FT_Face = None
+        FT_Done_FreeType(self.library)
+        self.faces, self.chain = [], None
+
+
+class ThreadRenderer(object):
+    '''
+    Renders batches of glyphs or lines of text on a pool of threads, each
+    with its own FreeType library, faces and GlyphCache.
+
+    Texts are rendered through a FontChain of the fonts, so that later fonts
+    are fallbacks for the characters the earlier ones do not cover.
+    '''
+
+    def __init__(self, fonts, size=16 * 64, resolution=72, workers=None,
+                 cache_bytes=16 * 1024 * 1024):
+        '''
+        Create a new ThreadRenderer object.
+
+        :param fonts: A font, or a sequence of fonts by order of preference.
+                      A font is a path, the contents of a font file (bytes
+                      or any buffer-protocol object, which must not be
+                      modified while the renderer exists), or a (path or
+                      contents, face index) tuple.
+
+        :param size: The character size, in 26.6 fractional points.
+
+        :param resolution: The horizontal and vertical resolution, in dpi.
+
+        :param workers: The number of threads, one per CPU if None.
+
+        :param cache_bytes: The budget of the GlyphCache of each thread.
+        '''
+        self._fonts = _load_fonts(fonts)
+        self._setup = (size, resolution, cache_bytes)
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(self.workers)
+        self._local = threading.local()
+        self._states = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _state(self):
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = _Worker(self._fonts, *self._setup)
+            self._local.state = state
+            with self._lock:
+                self._states.append(state)
+        return state
+
+    def _call(self, function, item):
+        # Apply function(state, item) in the calling worker thread
+        return function(self._state(), item)
+
+    def _map(self, function, items, chunksize):
+        # Apply function(state, item) to all the items, by chunks, and return
+        # the results in order
+        return self._map_chunks(
+            lambda state, chunk: [function(state, item) for item in chunk],
+            items, chunksize)
+
+    def _map_chunks(self, function, items, chunksize):
+        # Apply function(state, chunk), returning a list of results per item
+        # of the chunk, to all the items by chunks
+        items = list(items)
+        if chunksize is None:
+            chunksize = max(1, len(items) // (4 * self.workers))
+
+        def run(chunk):
+            return function(self._state(), chunk)
+        chunks = [items[i:i + chunksize]
+                  for i in range(0, len(items), chunksize)]
+        results = []
+        for chunk in self._executor.map(run, chunks):
+            results.extend(chunk)
+        return results
+
+    def render_glyphs(self, indices, flags=FT_LOAD_RENDER, font=0,
+                      chunksize=None):
+        '''
+        Render glyphs.
+
+        :param indices: A sequence of glyph indices.
+
+        :param flags: The flags used to load the glyphs, see
+                      Face.load_glyph. FT_LOAD_RENDER should be part of them.
+
+        :param font: The position of the font in the fonts of the renderer.
+
+        :param chunksize: The number of glyphs handed to a thread at once.
+
+        :return: The list of CachedGlyph objects, in the order of indices.
+        '''
+        return self._map(
+            lambda state, index: state.cache.get(state.faces[font],
+                                                 int(index), flags),
+            indices, chunksize)
+
+    def render_texts(self, texts, flags=FT_LOAD_RENDER,
+                     kerning=FT_KERNING_DEFAULT, phases=1, chunksize=None):
+        '''
+        Render lines of text, see freetype.text.render_text.
+
+        :param texts: A sequence of strings.
+
+        :param chunksize: The number of texts handed to a thread at once.
+
+        :return: The list of (image, left, top) tuples, in the order of
+                 texts.
+        '''
+        return self._map(
+            lambda state, text: state.chain.render_text(text, flags, kerning,
+                                                        phases),
+            texts, chunksize)
+
+    def measure_texts(self, texts, flags=FT_LOAD_DEFAULT,
+                      kerning=FT_KERNING_DEFAULT, chunksize=None):
+        '''
+        Measure lines of text, see FontChain.measure.
+
+        :param texts: A sequence of strings.
+
+        :param chunksize: The number of texts handed to a thread at once,
+                          and measured together (see FontChain.measure_many).
+
+        :return: The list of TextMetrics, in the order of texts.
+        '''
+        return self._map_chunks(
+            lambda state, chunk: state.chain.measure_many(chunk, flags,
+                                                          kerning),
+            texts, chunksize)
+
+    def close(self):
+        '''
+        Wait for the pending work, stop the threads and release their
+        FreeType libraries.
+        '''
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            states, self._states = self._states, []
+        for state in states:
+            state.close()
+
+
+class SharedCanvas(object):
+    '''
+    A stack of equally sized images in shared memory, written by the worker
+    processes of a ProcessRenderer.
+
+    'images' is a numpy array of shape (count, rows, width) (or (count, rows,
+    width, depth) if depth is not 1), and 'boxes' a (count, 4) numpy array
+    holding, for each image, the left and top bearings of the text (as
+    returned by freetype.text.render_text) and the width and rows actually
+    drawn, from the top-left corner of the image. Texts larger than the
+    images are clipped.
+    '''
+
+    def __init__(self, count, rows, width, depth=1, name=None):
+        '''
+        Create a new SharedCanvas object.
+
+        :param count: The number of images.
+
+        :param rows: The height of the images, in pixels.
+
+        :param width: The width of the images, in pixels.
+
+        :param depth: The number of channels per pixel (3 for LCD modes).
+
+        :param name: The name of an existing shared memory block to attach
+                     to (see 'descriptor'). A new block is created if None.
+        '''
+        import numpy
+        from multiprocessing import shared_memory
+        self.count, self.rows, self.width, self.depth = count, rows, width, \
+            depth
+        nboxes = count * 4 * 4
+        nbytes = nboxes + count * rows * width * depth
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True,
+                                                   size=max(1, nbytes))
+        else:
+            self._shm = shared_memory.SharedMemory(name)
+        self.boxes = numpy.ndarray((count, 4), dtype=numpy.int32,
+                                   buffer=self._shm.buf)
+        shape = (count, rows, width) + ((depth,) if depth != 1 else ())
+        self.images = numpy.ndarray(shape, dtype=numpy.ubyte,
+                                    buffer=self._shm.buf, offset=nboxes)
+
+    @property
+    def descriptor(self):
+        '''
+        A picklable (name, count, rows, width, depth) tuple to attach to the
+        canvas from another process, see 'attach'.
+        '''
+        return (self._shm.name, self.count, self.rows, self.width, self.depth)
+
+    @classmethod
+    def attach(cls, descriptor):
+        '''
+        Attach to a canvas created by another process.
+        '''
+        name, count, rows, width, depth = descriptor
+        return cls(count, rows, width, depth, name)
+
+    def image(self, i):
+        '''
+        Return the drawn part of an image, left, top as returned by
+        freetype.text.render_text.
+        '''
+        left, top, width, rows = self.boxes[i].tolist()
+        return self.images[i, :rows, :width], left, top
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        self.unlink()
+
+    def close(self):
+        '''
+        Detach from the shared memory. 'images', 'boxes' and the arrays
+        taken from them must not be used anymore.
+        '''
+        self.images = self.boxes = None
+        self._shm.close()
+
+    def unlink(self):
+        '''
+        Destroy the shared memory block, once every process has closed it.
+        '''
+        self._shm.unlink()
+
+
+# The FreeType state of a ProcessRenderer worker process
+_process_state = None
+
+
+def _open_descriptor(descriptor, keep):
+    # (buffer, index) of a font descriptor, the objects owning the buffers
+    # being appended to keep
+    from multiprocessing import shared_memory
+    kind, source, index = descriptor
+    if kind == 'path':
+        with open(source, mode='rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        name, nbytes = source
+        block = shared_memory.SharedMemory(name)
+        keep.append(block)
+        buffer = block.buf[:nbytes]
+    return buffer, index
+
+
+def _init_process(descriptors, size, resolution, cache_bytes):
+    global _process_state
+    keep = []
+    fonts = [_open_descriptor(descriptor, keep) for descriptor in descriptors]
+    _process_state = _Worker(fonts, size, resolution, cache_bytes)
+    _process_state.keep = keep
+
+
+def _render_into(job):
+    descriptor, start, texts, flags, kerning, phases = job
+    canvas = SharedCanvas.attach(descriptor)
+    try:
+        for i, text in enumerate(texts, start):
+            image, left, top = _process_state.chain.render_text(
+                text, flags, kerning, phases)
+            rows = min(image.shape[0], canvas.rows)
+            width = min(image.shape[1], canvas.width)
+            slot = canvas.images[i]
+            slot[...] = 0
+            slot[:rows, :width] = image[:rows, :width]
+            canvas.boxes[i] = left, top, width, rows
+            del slot
+    finally:
+        canvas.close()
+    return len(texts)
+
+
+class ProcessRenderer(object):
+    '''
+    Renders lines of text on a pool of processes, into a SharedCanvas.
+
+    Texts are rendered through a FontChain of the fonts, as with a
+    ThreadRenderer.
+    '''
+
+    def __init__(self, fonts, size=16 * 64, resolution=72, processes=None,
+                 cache_bytes=16 * 1024 * 1024):
+        '''
+        Create a new ProcessRenderer object.
+
+        :param fonts: A font, or a sequence of fonts by order of preference.
+                      A font is a path, the contents of a font file (bytes
+                      or any buffer-protocol object), or a (path or contents,
+                      face index) tuple. Paths are memory-mapped by the
+                      workers, contents are copied once into shared memory.
+
+        :param size: The character size, in 26.6 fractional points.
+
+        :param resolution: The horizontal and vertical resolution, in dpi.
+
+        :param processes: The number of worker processes, one per CPU if
+                          None.
+
+        :param cache_bytes: The budget of the GlyphCache of each process.
+        '''
+        from multiprocessing import shared_memory
+        if isinstance(fonts, (str, bytes, bytearray, memoryview, tuple)):
+            fonts = [fonts]
+        self._blocks = []
+        descriptors = []
+        for font in fonts:
+            source, index = font if isinstance(font, tuple) else (font, 0)
+            if isinstance(source, str):
+                descriptors.append(('path', os.path.abspath(source), index))
+                continue
+            data = memoryview(source).cast('B')
+            block = shared_memory.SharedMemory(create=True,
+                                               size=max(1, len(data)))
+            block.buf[:len(data)] = data
+            self._blocks.append(block)
+            descriptors.append(('shm', (block.name, len(data)), index))
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            self.processes, initializer=_init_process,
+            initargs=(descriptors, size, resolution, cache_bytes))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def render_texts(self, texts, canvas, start=0, flags=FT_LOAD_RENDER,
+                     kerning=FT_KERNING_DEFAULT, phases=1, chunksize=None):
+        '''
+        Render lines of text into a canvas, see freetype.text.render_text.
+        Only the names of the canvas and the texts are sent to the workers,
+        and only the numbers of rendered texts are sent back.
+
+        :param texts: A sequence of strings.
+
+        :param canvas: The SharedCanvas to draw into. Text i is drawn into
+                       image start + i.
+
+        :param start: The first image of the canvas to draw into.
+
+        :param chunksize: The number of texts handed to a process at once.
+        '''
+        texts = list(texts)
+        if start + len(texts) > canvas.count:
+            raise ValueError('%d texts do not fit in a canvas of %d images '
+                             'from image %d' % (len(texts), canvas.count,
+                                                start))
+        if chunksize is None:
+            chunksize = max(1, len(texts) // (4 * self.processes))
+        jobs = [(canvas.descriptor, start + i, texts[i:i + chunksize], flags,
+                 kerning, phases)
+                for i in range(0, len(texts), chunksize)]
+        for _ in self._executor.map(_render_into, jobs):
+            pass
+
+    def close(self):
+        '''
+        Stop the worker processes and release the fonts shared memory.
+        '''
+        self._executor.shutdown(wait=True)
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
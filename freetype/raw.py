@@ -124,6 +124,7 @@ FT_Get_Sfnt_Name       = _lib.FT_Get_Sfnt_Name
 try:
     # introduced between 2.2.x and 2.3.x
     FT_Get_Advance         = _lib.FT_Get_Advance
+    FT_Get_Advances        = _lib.FT_Get_Advances
 except AttributeError:
     pass
 
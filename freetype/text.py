@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+#
+#  FreeType high-level python API - Copyright 2011-2015 Nicolas P. Rougier
+#  Distributed under the terms of the new BSD license.
+#
+# -----------------------------------------------------------------------------
+'''
+Text rendering
+
+Renders a line of text into a numpy array in a single pass: glyphs are
+looked up once per string (through a GlyphCache), pen positions are computed
+from their cached advances and kerning, and bitmaps are blitted into a
+canvas allocated once.
+
+Text mixing scripts can be rendered and measured through a FontChain, which
+splits it into runs of characters drawn with the same face.
+
+**Note** This module requires numpy.
+'''
+from freetype import FT_LOAD_RENDER, FT_LOAD_DEFAULT, FT_KERNING_DEFAULT, \
+    BBox, TextMetrics
+from freetype.cache import GlyphCache
+
+
+def render_text(face, text, flags=FT_LOAD_RENDER, cache=None,
+                kerning=FT_KERNING_DEFAULT, phases=1):
+    '''
+    Render a line of text.
+
+    :param face: The Face to render with, at its current size and transform.
+
+    :param text: The text, as a string.
+
+    :param flags: The flags used to load the glyphs, see Face.load_glyph.
+                  FT_LOAD_RENDER should be part of them.
+
+    :param cache: A GlyphCache to look glyphs up in. A temporary one is used
+                  if None, which still renders each glyph only once.
+
+    :param kerning: The kerning mode (see FT_Kerning_Mode), or None to
+                    disable kerning.
+
+    :param phases: The number of horizontal subpixel phases glyphs are
+                   positioned with (see GlyphCache.place). Pen positions are
+                   rounded to integer pixels if 1.
+
+    :return: image, left, top where image is a numpy array of shape (rows,
+             width) (or (rows, width, 3) for LCD modes, etc.) and left, top
+             are the bearings of the image relative to the origin of the
+             first glyph, as for GlyphSlot.bitmap_left and bitmap_top.
+             Overlapping glyphs are combined with a maximum.
+    '''
+    return _render_runs([(face, face.get_char_indices(text).tolist())],
+                        flags, cache, kerning, phases)
+
+
+def _render_runs(runs, flags, cache, kerning, phases):
+    # Render consecutive runs of (face, glyph indices), the pen carrying
+    # over from one run to the next. Kerning only applies within a run.
+    import numpy
+    if cache is None:
+        cache = GlyphCache()
+    placed, pens = [], []
+    origin = numpy.zeros(2, dtype=numpy.int64)
+    for face, indices in runs:
+        if not indices:
+            continue
+        # Pen positions, in 26.6 fractional pixels
+        glyphs = {}
+        for index in indices:
+            if index not in glyphs:
+                glyphs[index] = cache.get(face, index, flags)
+        pen = numpy.zeros((len(indices), 2), dtype=numpy.int64)
+        if len(indices) > 1:
+            pen[1:] = [glyphs[index].advance for index in indices[:-1]]
+        if kerning is not None and face.has_kerning and len(indices) > 1:
+            pairs = numpy.array(indices, dtype=numpy.int64)
+            pairs = pairs[:-1] << 32 | pairs[1:]
+            pen[1:, 0] += face._get_kerning_pairs(pairs, kerning)
+        pen = numpy.cumsum(pen, axis=0) + origin
+        origin = pen[-1] + glyphs[indices[-1]].advance
+
+        if phases > 1:
+            for i, index in enumerate(indices):
+                glyph, pen[i, 0] = cache.place(face, index, int(pen[i, 0]),
+                                               flags, phases)
+                placed.append((glyph, glyph.to_numpy()))
+            pen[:, 1] >>= 6
+        else:
+            placed.extend((glyphs[index], glyphs[index].to_numpy())
+                          for index in indices)
+            pen >>= 6
+        pens.append(pen)
+    if not placed:
+        return numpy.zeros((0, 0), dtype=numpy.ubyte), 0, 0
+    pen = numpy.concatenate(pens)
+
+    # Bitmap boxes, upwards y
+    shape = numpy.array([data.shape[:2] for glyph, data in placed])
+    bearings = numpy.array([(glyph.left, glyph.top)
+                            for glyph, data in placed])
+    x0 = pen[:, 0] + bearings[:, 0]
+    y1 = pen[:, 1] + bearings[:, 1]
+    x1 = x0 + shape[:, 1]
+    y0 = y1 - shape[:, 0]
+    inked = (shape > 0).all(axis=1)
+    if not inked.any():
+        return numpy.zeros((0, 0), dtype=numpy.ubyte), 0, 0
+    left, right = x0[inked].min(), x1[inked].max()
+    bottom, top = y0[inked].min(), y1[inked].max()
+
+    extra = placed[inked.argmax()][1].shape[2:]
+    image = numpy.zeros((top - bottom, right - left) + extra,
+                        dtype=numpy.ubyte)
+    for i in numpy.flatnonzero(inked).tolist():
+        rows, width = shape[i]
+        x, y = x0[i] - left, top - y1[i]
+        region, data = image[y:y + rows, x:x + width], placed[i][1]
+        if data.dtype == numpy.bool_:
+            region[data] = 255
+        else:
+            numpy.maximum(region, data, out=region)
+    return image, int(left), int(top)
+
+
+class FontChain(object):
+    '''
+    An ordered list of fallback faces. Each character of a text is drawn with
+    the first face whose charmap covers it.
+
+    The face chosen for each character code is memoized, and looked up for a
+    whole text at once from the faces coverages (see Face.coverage), so that
+    no per-character get_char_index probes are needed.
+    '''
+
+    def __init__(self, faces, cache=None):
+        '''
+        Create a new FontChain object.
+
+        :param faces: A sequence of Face objects, by order of preference,
+                      with their character sizes already set.
+
+        :param cache: The GlyphCache shared by all the faces. A new one is
+                      created if None.
+        '''
+        self.faces = list(faces)
+        if not self.faces:
+            raise ValueError('a FontChain needs at least one face')
+        self.cache = cache if cache is not None else GlyphCache()
+        # Character code -> position of the chosen face, or -1 if none
+        self._choices = {}
+        self._coverages = None
+
+    def _choose(self, codes):
+        # Position of the face chosen for each code (-1 if none covers it)
+        import numpy
+        coverages = [face.coverage() for face in self.faces]
+        if self._coverages is None or \
+                any(a is not b for a, b in zip(coverages, self._coverages)):
+            # A charmap was changed since the last lookup
+            self._choices = {}
+            self._coverages = coverages
+        unique, inverse = numpy.unique(codes, return_inverse=True)
+        choices = numpy.array([self._choices.get(code, -2)
+                               for code in unique.tolist()], dtype=numpy.intp)
+        missing = choices == -2
+        if missing.any():
+            pending = unique[missing]
+            found = numpy.full(len(pending), -1, dtype=numpy.intp)
+            for position, coverage in enumerate(coverages):
+                found[(found < 0) & coverage.covers(pending)] = position
+            self._choices.update(zip(pending.tolist(), found.tolist()))
+            choices[missing] = found
+        return choices[inverse.ravel()]
+
+    def runs(self, text):
+        '''
+        Split a text into runs of characters drawn with the same face.
+
+        Characters that no face covers are kept in the run before them (or
+        drawn with the first face at the start of the text), and are rendered
+        as that face's missing glyph.
+
+        :param text: The text, as a string.
+
+        :return: A list of (face, start, stop) tuples, where text[start:stop]
+                 is the run.
+        '''
+        import numpy
+        if not text:
+            return []
+        codes = numpy.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+        choices = self._choose(codes)
+        last = numpy.where(choices >= 0, numpy.arange(len(choices)), -1)
+        last = numpy.maximum.accumulate(last)
+        choices = numpy.where(last >= 0, choices[last], 0)
+        breaks = numpy.flatnonzero(numpy.diff(choices)) + 1
+        starts = [0] + breaks.tolist()
+        stops = breaks.tolist() + [len(text)]
+        return [(self.faces[choices[start]], start, stop)
+                for start, stop in zip(starts, stops)]
+
+    def render_text(self, text, flags=FT_LOAD_RENDER,
+                    kerning=FT_KERNING_DEFAULT, phases=1):
+        '''
+        Render a line of text, each run through its face and the shared glyph
+        cache. See the render_text function for the parameters and the
+        result; kerning only applies between glyphs of the same run.
+        '''
+        runs = [(face, face.get_char_indices(text[start:stop]).tolist())
+                for face, start, stop in self.runs(text)]
+        return _render_runs(runs, flags, self.cache, kerning, phases)
+
+    def measure(self, text, flags=FT_LOAD_DEFAULT,
+                kerning=FT_KERNING_DEFAULT):
+        '''
+        Measure a line of text without rendering it, see Face.measure.
+
+        :return: A TextMetrics. Its ascender and height are the largest, and
+                 its descender the lowest, of the faces used by the text (of
+                 the first face if the text is empty).
+        '''
+        return self.measure_many([text], flags, kerning)[0]
+
+    def measure_many(self, texts, flags=FT_LOAD_DEFAULT,
+                     kerning=FT_KERNING_DEFAULT):
+        '''
+        Measure several lines of text at once, see 'measure'. The runs of all
+        the texts drawn with a same face are measured in one call.
+
+        :param texts: A sequence of strings.
+
+        :return: A list of TextMetrics, in the order of texts.
+        '''
+        runs = [self.runs(text) or [(self.faces[0], 0, 0)] for text in texts]
+        by_face = {}
+        for text, text_runs in zip(texts, runs):
+            for face, start, stop in text_runs:
+                by_face.setdefault(face, []).append(text[start:stop])
+        measured = dict((face, iter(face.measure_many(pieces, flags,
+                                                      kerning)))
+                        for face, pieces in by_face.items())
+
+        result = []
+        for text_runs in runs:
+            # The runs of a face come back in order
+            metrics = [next(measured[face]) for face, start, stop in text_runs]
+            pen, box = 0, None
+            for m in metrics:
+                b = m.bbox
+                if b.xMin or b.yMin or b.xMax or b.yMax:
+                    run_box = (b.xMin + pen, b.yMin, b.xMax + pen, b.yMax)
+                    if box is None:
+                        box = run_box
+                    else:
+                        box = (min(box[0], run_box[0]),
+                               min(box[1], run_box[1]),
+                               max(box[2], run_box[2]),
+                               max(box[3], run_box[3]))
+                pen += m.advance
+            result.append(TextMetrics(pen, BBox(box or (0, 0, 0, 0)),
+                                      max(m.ascender for m in metrics),
+                                      min(m.descender for m in metrics),
+                                      max(m.height for m in metrics)))
+        return result
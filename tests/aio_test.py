@@ -0,0 +1,36 @@
+import asyncio
+
+import freetype
+import pytest
+
+
+def test_async_renderer():
+    pytest.importorskip("numpy")
+    from freetype.aio import AsyncRenderer
+    from freetype.text import render_text
+
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(24 * 64)
+
+    async def main():
+        async with AsyncRenderer("../examples/Vera.ttf", 24 * 64, workers=1,
+                                 max_pending=2) as renderer:
+            results = await asyncio.gather(
+                *[renderer.render_text("Hello") for _ in range(10)])
+            assert all(result is results[0] for result in results)
+            cache = renderer._threads._states[0].cache
+            assert cache.misses == 4 and cache.hits == 0
+
+            texts = ["AVA", "World", "wave", ""]
+            images = await asyncio.gather(
+                *[renderer.render_text(text) for text in texts])
+            for text, (image, left, top) in zip(texts, images):
+                expected, expected_left, expected_top = render_text(face, text)
+                assert (left, top) == (expected_left, expected_top)
+                assert (image == expected).all()
+
+            metrics = await renderer.measure("Hello")
+            assert metrics.advance == face.measure("Hello").advance
+            assert not renderer._pending
+
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import pytest
+
+import freetype
+
+
+def test_atlas_packing():
+    numpy = pytest.importorskip("numpy")
+    from freetype.atlas import Atlas
+
+    atlas = Atlas(64, 64, padding=1)
+    a = atlas.add(numpy.full((10, 20), 1, dtype=numpy.ubyte))
+    b = atlas.add(numpy.full((5, 30), 2, dtype=numpy.ubyte))
+    c = atlas.add(numpy.full((8, 20), 3, dtype=numpy.ubyte))
+    assert a == (0, 0, 20, 10)
+    assert b == (21, 0, 30, 5)
+    assert c == (21, 6, 20, 8)
+    assert (atlas.data[0:10, 0:20] == 1).all()
+    assert (atlas.data[6:14, 21:41] == 3).all()
+    assert atlas.used == 200 + 150 + 160
+    assert atlas.fill_ratio == atlas.used / 4096.0
+    assert atlas.uv(b) == (21 / 64.0, 0.0, 51 / 64.0, 5 / 64.0)
+    assert atlas.allocate(64, 1) is None
+    assert atlas.allocate(10, 64) is None
+
+    with pytest.raises(ValueError):
+        atlas.add(numpy.zeros((2, 2, 3), dtype=numpy.ubyte))
+
+
+def test_atlas_glyphs():
+    numpy = pytest.importorskip("numpy")
+    from freetype.atlas import Atlas
+
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(24 * 64)
+    indices = face.get_char_indices(u"Hello, World!")
+    atlas = Atlas(128, 128)
+    glyphs = atlas.add_glyphs(face, indices)
+    assert [glyph.index for glyph in glyphs] == list(indices)
+    for glyph in glyphs:
+        face.load_glyph(glyph.index)
+        x, y, w, h = glyph.region
+        expected = face.glyph.bitmap.to_numpy()
+        assert (atlas.data[y:y + h, x:x + w, 0] == expected).all()
+        assert (glyph.left, glyph.top) == \
+            (face.glyph.bitmap_left, face.glyph.bitmap_top)
+
+    # Tallest first leaves no overlapping regions
+    mask = numpy.zeros((128, 128), dtype=int)
+    for glyph in glyphs:
+        x, y, w, h = glyph.region
+        mask[y:y + h, x:x + w] += 1
+    assert mask.max() == 1
+    assert 0 < atlas.fill_ratio < 1
@@ -0,0 +1,89 @@
+from ctypes import POINTER, c_ubyte, cast
+
+import freetype
+import pytest
+
+
+def _load(char="A", flags=freetype.FT_LOAD_RENDER):
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(48 * 64)
+    face.load_char(char, flags)
+    return face
+
+
+def test_bitmap_view_matches_buffer():
+    face = _load()
+    bitmap = face.glyph.bitmap
+    view = bitmap.view
+    assert len(view) == bitmap.rows * bitmap.pitch
+    assert view.tolist() == bitmap.buffer
+    assert bitmap.row(1).tobytes() == \
+        view[bitmap.pitch:2 * bitmap.pitch].tobytes()
+
+
+def test_bitmap_negative_pitch():
+    data = (c_ubyte * 6)(1, 2, 3, 4, 5, 6)
+    ft_bitmap = freetype.FT_Bitmap()
+    ft_bitmap.rows, ft_bitmap.width, ft_bitmap.pitch = 2, 3, -3
+    ft_bitmap.buffer = cast(data, POINTER(c_ubyte))
+    bitmap = freetype.Bitmap(ft_bitmap)
+    assert bitmap.buffer == [1, 2, 3, 4, 5, 6]
+    assert bitmap.row(0).tolist() == [4, 5, 6]
+    copy = bitmap.copy()
+    assert copy.pitch == 3
+    assert copy.buffer == [4, 5, 6, 1, 2, 3]
+
+
+def test_bitmap_copy_outlives_slot():
+    face = _load("A")
+    copy = face.glyph.bitmap.copy()
+    expected = face.glyph.bitmap.buffer
+    face.load_char("B")
+    assert copy.buffer == expected
+    assert (copy.rows, copy.width) != (0, 0)
+
+    face.load_char(" ")
+    empty = face.glyph.bitmap
+    assert empty.buffer == []
+    assert empty.copy().buffer == []
+
+
+def test_bitmap_to_numpy_gray():
+    np = pytest.importorskip("numpy")
+    face = _load()
+    bitmap = face.glyph.bitmap
+    array = bitmap.to_numpy()
+    expected = np.array(bitmap.buffer, dtype=np.uint8).reshape(
+        bitmap.rows, bitmap.pitch)[:, :bitmap.width]
+    assert array.shape == (bitmap.rows, bitmap.width)
+    assert np.shares_memory(array, np.frombuffer(bitmap.view, np.uint8))
+    assert (array == expected).all()
+    assert not np.shares_memory(bitmap.to_numpy(copy=True), array)
+
+
+def test_bitmap_to_numpy_modes():
+    np = pytest.importorskip("numpy")
+    face = _load()
+    face.load_char("A", freetype.FT_LOAD_RENDER |
+                   freetype.FT_LOAD_TARGET_MONO)
+    bitmap = face.glyph.bitmap
+    mono = bitmap.to_numpy()
+    assert mono.dtype == bool
+    assert mono.shape == (bitmap.rows, bitmap.width)
+    assert mono[-1].any() and not mono[:, bitmap.width:].any()
+
+    face.load_char("A", freetype.FT_LOAD_RENDER | freetype.FT_LOAD_TARGET_LCD)
+    bitmap = face.glyph.bitmap
+    lcd = bitmap.to_numpy()
+    assert lcd.shape == (bitmap.rows, bitmap.width // 3, 3)
+    assert lcd[:, :, 1].tolist() == [
+        bitmap.row(i)[1:bitmap.width:3].tolist() for i in range(bitmap.rows)]
+
+    face.load_char("A", freetype.FT_LOAD_RENDER |
+                   freetype.FT_LOAD_TARGET_LCD_V)
+    bitmap = face.glyph.bitmap
+    lcd_v = bitmap.to_numpy()
+    assert lcd_v.shape == (bitmap.rows // 3, bitmap.width, 3)
+    assert lcd_v[:, :, 2].tolist() == [
+        bitmap.row(i)[:bitmap.width].tolist()
+        for i in range(2, bitmap.rows, 3)]
@@ -0,0 +1,91 @@
+import freetype
+import pytest
+from freetype.cache import GlyphCache
+
+
+def _face(size=24):
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(size * 64)
+    return face
+
+
+def test_glyph_cache_hits():
+    face = _face()
+    cache = GlyphCache()
+    glyph = cache.get_char(face, "A")
+    face.load_char("A")
+    assert glyph.bitmap.buffer == face.glyph.bitmap.buffer
+    assert (glyph.left, glyph.top) == \
+        (face.glyph.bitmap_left, face.glyph.bitmap_top)
+    assert glyph.advance == (face.glyph.advance.x, face.glyph.advance.y)
+
+    assert cache.get_char(face, "A") is glyph
+    face.set_char_size(12 * 64)
+    assert cache.get_char(face, "A") is not glyph
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["glyphs"]) == (1, 2, 2)
+
+
+def test_cached_glyph_to_numpy():
+    pytest.importorskip("numpy")
+    face = _face()
+    glyph = GlyphCache().get_char(face, "A")
+    face.load_char("A")
+    array = glyph.to_numpy()
+    assert (array == face.glyph.bitmap.to_numpy()).all()
+    assert glyph.to_numpy() is array
+
+
+def test_glyph_cache_budget():
+    face = _face()
+    sizes = [cache_glyph.nbytes for cache_glyph in
+             (GlyphCache().get_char(face, c) for c in "ABC")]
+    cache = GlyphCache(max_bytes=sizes[1] + sizes[2])
+    for c in "ABC":
+        cache.get_char(face, c)
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.nbytes == sizes[1] + sizes[2]
+    cache.get_char(face, "B")
+    assert cache.hits == 1
+
+
+def test_cache_manager():
+    manager = freetype.CacheManager()
+    face_id = manager.add_face("../examples/Vera.ttf")
+    with open("../examples/Vera.ttf", "rb") as f:
+        memory_id = manager.add_face(bytearray(f.read()))
+    index = manager.get_char_index(face_id, "A")
+    assert index == manager.get_char_index(memory_id, "A") != 0
+
+    face = _face()
+    face.load_glyph(index)
+    sbit = manager.lookup_sbit(face_id, index, 24)
+    assert sbit.buffer == bytes(bytearray(face.glyph.bitmap.buffer))
+    assert (sbit.left, sbit.top) == \
+        (face.glyph.bitmap_left, face.glyph.bitmap_top)
+    assert sbit.xadvance == face.glyph.advance.x // 64
+
+    glyph = manager.lookup_glyph(memory_id, index, 24)
+    assert glyph.format == freetype.FT_GLYPH_FORMAT_OUTLINE
+    manager.remove_face(memory_id)
+    manager.reset()
+    assert manager.lookup_sbit(face_id, index, 24).buffer == sbit.buffer
+
+
+def test_glyph_cache_subpixel():
+    face = _face(12)
+    flags = freetype.FT_LOAD_RENDER | freetype.FT_LOAD_NO_HINTING
+    cache = GlyphCache()
+    glyph, x = cache.place(face, 36, 10 * 64 + 16, flags)
+    assert x == 10
+    assert cache.place(face, 36, 10 * 64 + 60, flags) == \
+        (cache.get(face, 36, flags), 11)
+    assert cache.place(face, 36, 11 * 64 + 20, flags) == (glyph, 11)
+    assert cache.misses == 2
+
+    # Same bitmap as rendering with a translated transform
+    face.set_transform(freetype.Matrix(0x10000, 0, 0, 0x10000),
+                       freetype.Vector(16, 0))
+    face.load_glyph(36, flags)
+    assert glyph.bitmap.buffer == face.glyph.bitmap.buffer
+    assert glyph.left == face.glyph.bitmap_left
@@ -0,0 +1,11 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 7):
+    # freetype.aio uses async syntax and asyncio.run / get_running_loop
+    collect_ignore.append("aio_test.py")
+if sys.version_info < (3,):
+    # freetype.index uses os.replace, st_mtime_ns and concurrent.futures
+    collect_ignore.append("index_test.py")
+    # freetype.parallel uses concurrent.futures
+    collect_ignore.append("parallel_test.py")
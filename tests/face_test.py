@@ -0,0 +1,281 @@
+import io
+import os
+import pickle
+
+import freetype
+import pytest
+
+
+def _face(size=24):
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(size * 64)
+    return face
+
+
+def test_load_glyphs():
+    np = pytest.importorskip("numpy")
+    face = _face()
+    indices = [face.get_char_index(c) for c in "Hello, World"]
+    records, data = face.load_glyphs(indices, bitmaps=True)
+    assert records["index"].tolist() == indices
+    for record, index in zip(records, indices):
+        face.load_glyph(index)
+        slot = face.glyph
+        assert record["horiAdvance"] == slot.metrics.horiAdvance
+        assert record["horiBearingY"] == slot.metrics.horiBearingY
+        assert record["advance_x"] == slot.advance.x
+        assert record["bitmap_left"] == slot.bitmap_left
+        assert record["bitmap_top"] == slot.bitmap_top
+        assert record["bitmap_rows"] == slot.bitmap.rows
+        start, size = record["bitmap_offset"], \
+            record["bitmap_rows"] * record["bitmap_pitch"]
+        assert data[start:start + size].tolist() == slot.bitmap.buffer
+
+    records = face.load_glyphs(np.array(indices), freetype.FT_LOAD_DEFAULT)
+    assert records["horiAdvance"].tolist() == \
+        face.load_glyphs(indices)["horiAdvance"].tolist()
+
+
+def test_advance_table():
+    pytest.importorskip("numpy")
+    face = _face()
+    flags = freetype.FT_LOAD_NO_HINTING
+    advances = face.get_advances(10, 5, flags)
+    assert advances.tolist() == [face.get_advance(i, flags)
+                                 for i in range(10, 15)]
+    table = face.advance_table(flags)
+    assert len(table) == face.num_glyphs
+    assert table[10:15].tolist() == advances.tolist()
+    assert face.advance_table(flags) is table
+
+    face.set_char_size(48 * 64)
+    assert face.advance_table(flags) is not table
+    assert face.advance_table(flags)[12] == face.get_advance(12, flags)
+
+
+def test_get_char_indices():
+    np = pytest.importorskip("numpy")
+    face = _face()
+    text = u"Hello, W\u00f6rld \u20ac\u4e2d\U0001F600"
+    expected = [face.get_char_index(c) for c in text]
+    assert face.get_char_indices(text).tolist() == expected
+    assert face.get_char_indices([ord(c) for c in text]).tolist() == expected
+
+    codes, glyphs, dense = face._get_cmap_table()
+    face._cmap_table = codes, glyphs, None
+    assert face.get_char_indices(text).tolist() == expected
+
+    charmaps = face.charmaps
+    other = [c for c in charmaps if c.index != face.charmap.index][0]
+    face.set_charmap(other)
+    assert face.get_char_indices(text).tolist() == \
+        [face.get_char_index(c) for c in text]
+    face.select_charmap(freetype.FT_ENCODING_UNICODE)
+    assert face.get_char_indices(text).tolist() == expected
+
+
+def test_kerning_table():
+    pytest.importorskip("numpy")
+    face = _face()
+    text = "AVAToWAY"
+    glyphs = [face.get_char_index(c) for c in text]
+    expected = []
+    for left, right in zip(text, text[1:]):
+        kerning = face.get_kerning(left, right)
+        expected.append((kerning.x, kerning.y))
+    assert [face.get_glyph_kerning(l, r)
+            for l, r in zip(glyphs, glyphs[1:])] == expected
+
+    table = face.kerning_table(glyphs)
+    assert face.kerning_table(glyphs[::-1]) is table
+    for index in range(face.KERNING_TABLES):
+        face.kerning_table([index])
+    assert len(face._kerning_tables) == face.KERNING_TABLES
+    assert face.kerning_table(glyphs) is not table
+    assert 0 < len(table) == len(table.pairs)
+    assert [table.get(l, r) for l, r in zip(glyphs, glyphs[1:])] == expected
+    kerning = table.lookup(glyphs)
+    assert kerning[0].tolist() == [0, 0]
+    assert list(map(tuple, kerning[1:].tolist())) == expected
+    assert any(x for x, y in expected)
+
+
+def test_measure():
+    pytest.importorskip("numpy")
+    face = _face()
+    pen, previous, top = 0, 0, 0
+    for char in "AVATAR":
+        face.load_char(char)
+        pen += face.get_kerning(previous, char).x + face.glyph.advance.x
+        top = max(top, face.glyph.metrics.horiBearingY)
+        previous = char
+    metrics = face.measure("AVATAR")
+    assert metrics.advance == pen
+    assert metrics.bbox.yMax == top and metrics.bbox.yMin == 0
+    assert metrics.ascender == face.size.ascender
+
+    face.load_char(" ")
+    space = face.glyph.advance.x
+    many = face.measure_many(["", "AVATAR", "  ", "AV"])
+    assert [m.advance for m in many] == \
+        [0, pen, 2 * space, face.measure("AV").advance]
+    # "AVATAR" alone is measured without numpy
+    box = metrics.bbox
+    assert (many[1].bbox.xMin, many[1].bbox.yMin, many[1].bbox.xMax,
+            many[1].bbox.yMax) == (box.xMin, box.yMin, box.xMax, box.yMax)
+    assert (many[2].bbox.xMin, many[2].bbox.xMax) == (0, 0)
+
+
+def test_face_from_mmap():
+    face = freetype.Face.from_mmap("../examples/Vera.ttf")
+    reference = freetype.Face("../examples/Vera.ttf")
+    assert face.family_name == reference.family_name
+    for f in (face, reference):
+        f.set_char_size(24 * 64)
+        f.load_char("g")
+    assert face.glyph.bitmap.buffer == reference.glyph.bitmap.buffer
+
+
+def test_face_from_bytes_zero_copy():
+    with open("../examples/Vera.ttf", "rb") as f:
+        data = f.read()
+    reference = freetype.Face("../examples/Vera.ttf")
+    body = bytearray(data)
+    for buffer in (data, body, memoryview(b"--" + data)[2:]):
+        face = freetype.Face.from_bytes(buffer)
+        assert face.family_name == reference.family_name
+        assert face.num_glyphs == reference.num_glyphs
+
+    # The buffer is pinned as long as the face exists (it is copied on
+    # Python 2)
+    if not freetype.PY3:
+        return
+    face = freetype.Face.from_bytes(body)
+    with pytest.raises(BufferError):
+        body.extend(b"-")
+    del face
+    body.extend(b"-")
+
+
+def test_face_from_stream():
+    with open("../examples/Vera.ttf", "rb") as f:
+        data = f.read()
+
+    class Stream(io.BytesIO):
+        nbytes = 0
+
+        def readinto(self, buffer):
+            count = io.BytesIO.readinto(self, buffer)
+            Stream.nbytes += count
+            return count
+
+    stream = Stream(data)
+    face = freetype.Face.from_stream(stream, close=True)
+    assert face.family_name == b"Bitstream Vera Sans"
+    assert 0 < Stream.nbytes < len(data)
+
+    reference = _face()
+    face.set_char_size(24 * 64)
+    for f in (face, reference):
+        f.load_char("g")
+    assert face.glyph.bitmap.buffer == reference.glyph.bitmap.buffer
+    del face
+    assert stream.closed
+
+
+def test_coverage():
+    pytest.importorskip("numpy")
+    face = _face()
+    coverage = face.coverage()
+    chars = [charcode for charcode, index in face.get_chars() if index]
+    assert coverage.codes().tolist() == sorted(chars)
+    assert len(coverage) == len(chars)
+    assert "A" in coverage and 0x4E00 not in coverage
+    assert coverage.covers(u"A\u4e00").tolist() == [True, False]
+    assert face.coverage() is coverage
+
+    digits = freetype.Coverage.from_codes("0123456789")
+    assert digits.ranges.tolist() == [[48, 58]]
+    cjk = freetype.Coverage([[0x4E00, 0xA000]])
+    assert coverage & digits == digits
+    assert (coverage | cjk) - cjk == coverage
+    assert len(coverage ^ digits) == len(coverage) - 10
+    assert (digits & cjk) == freetype.Coverage()
+
+
+def test_pickle():
+    face = _face(20)
+    face.set_transform(freetype.FT_Matrix(65536, 10000, 0, 65536),
+                       freetype.FT_Vector(64, 0))
+    with open("../examples/Vera.ttf", "rb") as f:
+        data = f.read()
+    memory = freetype.Face.from_bytes(data)
+    memory.set_pixel_sizes(0, 30)
+    mapped = freetype.Face.from_mmap("../examples/Vera.ttf")
+    for original in (face, memory, mapped):
+        copy = pickle.loads(pickle.dumps(original))
+        assert copy.family_name == original.family_name
+        assert copy._size_key() == original._size_key()
+        assert copy._transform == original._transform
+        assert copy.charmap.index == original.charmap.index
+        original.load_char("A")
+        copy.load_char("A")
+        assert copy.glyph.bitmap.buffer == original.glyph.bitmap.buffer
+    assert len(pickle.dumps(mapped)) < 1000
+
+    with pytest.raises(TypeError):
+        pickle.dumps(freetype.Face.from_stream(io.BytesIO(data)))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork():
+    face = _face()
+    face.load_char("A")
+    expected = face.glyph.bitmap.buffer
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            face.load_char("A")
+            ok = face._library is freetype.get_handle() and \
+                face.glyph.bitmap.buffer == expected
+            os.write(write, b"1" if ok else b"0")
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b"1"
+    os.close(read)
+    os.close(write)
+    face.load_char("A")
+    assert face.glyph.bitmap.buffer == expected
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"),
+                    reason="requires os.register_at_fork")
+def test_fork_deleted_file(tmpdir, monkeypatch):
+    path = str(tmpdir.join("Vera.ttf"))
+    with open("../examples/Vera.ttf", "rb") as src, open(path, "wb") as dst:
+        dst.write(src.read())
+    deleted = freetype.Face(path)
+    os.remove(path)
+    face = freetype.Face("../examples/VeraMono.ttf")
+    # The failing face comes first, and must not stop the others
+
+    class Faces(list):
+        add = list.append
+
+    monkeypatch.setattr(freetype, "_faces", Faces([deleted, face]))
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = face._library is freetype.get_handle() and \
+                deleted._library is not freetype.get_handle() and \
+                deleted._FT_Face is not None
+            os.write(write, b"1" if ok else b"0")
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b"1"
+    os.close(read)
+    os.close(write)
@@ -0,0 +1,80 @@
+import os
+import shutil
+
+import pytest
+
+
+def test_font_index(tmp_path):
+    pytest.importorskip("numpy")
+    from freetype.index import FontIndex
+
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    for name in ("Vera.ttf", "VeraMono.ttf"):
+        shutil.copy(os.path.join("..", "examples", name), str(fonts))
+    (fonts / "broken.ttf").write_bytes(b"not a font")
+    path = str(tmp_path / "index.json.gz")
+
+    index = FontIndex(path)
+    assert index.scan(str(fonts), processes=2) == 3
+    index.save()
+    assert len(index) == 2
+    assert sorted(os.listdir(str(tmp_path))) == ["fonts", "index.json.gz"]
+
+    (vera, record), = index.find(family="Bitstream Vera Sans")
+    assert os.path.basename(vera) == "Vera.ttf"
+    assert record["style"] == "Roman" and record["index"] == 0
+    assert [1, 0, 0, 1] in [name[:4] for name in record["names"]]
+    assert len(index.find(char="A")) == 2
+    assert index.find(char=0x4E00) == []
+
+    # Only modified files are rescanned after reloading the index
+    index = FontIndex(path)
+    assert len(index) == 2
+    assert index.scan(str(fonts), processes=0) == 0
+    os.remove(str(fonts / "broken.ttf"))
+    with open(str(fonts / "VeraMono.ttf"), "ab") as f:
+        f.write(b"\0")
+    assert index.scan(str(fonts), processes=0) == 1
+    assert len(index.files) == 2
+
+
+def test_font_index_scan_errors(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    from freetype import index as font_index
+
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    for name in ("Vera.ttf", "VeraMono.ttf"):
+        shutil.copy(os.path.join("..", "examples", name), str(fonts))
+    describe_face = font_index.describe_face
+
+    def describe_vera(face):
+        if face.family_name == b"Bitstream Vera Sans Mono":
+            raise MemoryError
+        return describe_face(face)
+    monkeypatch.setattr(font_index, "describe_face", describe_vera)
+
+    # The failed file is left out, and scanned again next time
+    index = font_index.FontIndex()
+    assert index.scan(str(fonts), processes=0) == 2
+    assert [os.path.basename(path) for path in index.files] == ["Vera.ttf"]
+    monkeypatch.setattr(font_index, "describe_face", describe_face)
+    assert index.scan(str(fonts), processes=0) == 1
+    assert len(index) == 2
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires POSIX permissions")
+def test_font_index_save_mode(tmp_path):
+    from freetype.index import FontIndex
+
+    path = str(tmp_path / "index.json.gz")
+    umask = os.umask(0o022)
+    try:
+        FontIndex(path).save()
+        assert os.stat(path).st_mode & 0o777 == 0o644
+        os.chmod(path, 0o640)
+        FontIndex(path).save()
+        assert os.stat(path).st_mode & 0o777 == 0o640
+    finally:
+        os.umask(umask)
@@ -0,0 +1,110 @@
+import freetype
+import pytest
+
+
+def _outline(char="g"):
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(48 * 64)
+    face.load_char(char, freetype.FT_LOAD_DEFAULT)
+    return face, face.glyph.outline
+
+
+def test_outline_lists():
+    face, outline = _outline()
+    slot = face._FT_Face.contents.glyph.contents
+    n = outline.n_points
+    assert outline.points == [(slot.outline.points[i].x,
+                               slot.outline.points[i].y) for i in range(n)]
+    assert len(outline.tags) == n
+    assert outline.contours[-1] == n - 1
+
+
+def test_outline_arrays():
+    np = pytest.importorskip("numpy")
+    face, outline = _outline()
+    points, tags, contours = outline.to_numpy()
+    assert points.shape == (outline.n_points, 2)
+    assert points.tolist() == [list(p) for p in outline.points]
+    assert tags.tolist() == outline.tags
+    assert contours.tolist() == outline.contours
+
+    points[0] += 64
+    assert outline.points[0] == tuple(points[0])
+    copies = outline.to_numpy(copy=True)
+    assert not np.shares_memory(copies[0], points)
+
+    face.load_char(" ", freetype.FT_LOAD_DEFAULT)
+    points, tags, contours = face.glyph.outline.to_numpy()
+    assert points.shape == (0, 2) and tags.size == contours.size == 0
+
+
+def _decompose(outline, shift, delta):
+    verbs, points = [], []
+
+    def segment(verb):
+        def callback(*args):
+            verbs.append(verb)
+            points.extend([v.x, v.y] for v in args[:-1])
+        return callback
+
+    outline.decompose(None, segment(freetype.Outline.MOVE_TO),
+                      segment(freetype.Outline.LINE_TO),
+                      segment(freetype.Outline.CONIC_TO),
+                      segment(freetype.Outline.CUBIC_TO), shift, delta)
+    return verbs, points
+
+
+def test_outline_get_path_matches_decompose():
+    pytest.importorskip("numpy")
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(37 * 64)
+    for index in range(face.num_glyphs):
+        face.load_glyph(index, freetype.FT_LOAD_DEFAULT)
+        outline = face.glyph.outline
+        for shift, delta in ((0, 0), (2, 7)):
+            verbs, points = outline.get_path(shift, delta)
+            assert (verbs.tolist(), points.tolist()) == \
+                _decompose(outline, shift, delta)
+
+
+def test_outline_get_path_cubic_and_conic_start():
+    pytest.importorskip("numpy")
+    from ctypes import POINTER, c_short, c_ubyte, cast
+
+    coords = [(0, 0), (10, 30), (40, 30), (50, 0),
+              (60, 10), (80, 20), (70, -5), (61, -3)]
+    tags = [1, 2, 2, 1, 0, 0, 1, 0]
+    points = (freetype.FT_Vector * len(coords))(*coords)
+    ft_tags = (c_ubyte * len(tags))(*tags)
+    contours = (c_short * 2)(3, 7)
+    ft_outline = freetype.FT_Outline(
+        2, len(coords), cast(points, POINTER(freetype.FT_Vector)),
+        cast(ft_tags, POINTER(c_ubyte)), cast(contours, POINTER(c_short)), 0)
+    outline = freetype.Outline(ft_outline)
+    verbs, path = outline.get_path()
+    assert (verbs.tolist(), path.tolist()) == _decompose(outline, 0, 0)
+    assert verbs.tolist() == [0, 3, 1, 0, 2, 2, 2]
+
+
+def test_signed_distance_field():
+    numpy = pytest.importorskip("numpy")
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_pixel_sizes(0, 32)
+    face.load_char("O", freetype.FT_LOAD_NO_HINTING)
+    field, left, top = face.glyph.outline.to_sdf(spread=4)
+    cbox = face.glyph.outline.get_cbox()
+    assert (left, top) == (cbox.xMin // 64 - 4, -(-cbox.yMax // 64) + 4)
+    assert field[0, 0] == 0
+    # The ring of the "O" is inside, its counter outside
+    rows, width = field.shape
+    assert field[rows // 2, 5] > 128 and field[rows // 2, width // 2] < 128
+
+    if freetype.version() >= (2, 11, 0):
+        rendered, rendered_left, rendered_top = face.glyph.render_sdf(spread=4)
+        assert (rendered_left, rendered_top) == (left, top)
+        assert numpy.abs(rendered.astype(int) - field).max() <= 2
+        # The spread of the library is left as it was
+        spread = freetype.FT_Int()
+        freetype.FT_Property_Get(freetype.get_handle(), b"sdf", b"spread",
+                                 freetype.byref(spread))
+        assert spread.value == 8
@@ -0,0 +1,57 @@
+import freetype
+import pytest
+
+
+def test_thread_renderer():
+    numpy = pytest.importorskip("numpy")
+    from freetype.parallel import ThreadRenderer
+    from freetype.text import render_text
+
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(24 * 64)
+    texts = ["Hello", "AVA", "", "World", "wave"] * 20
+    with ThreadRenderer(["../examples/Vera.ttf", "../examples/VeraMono.ttf"],
+                        24 * 64, workers=4) as renderer:
+        images = renderer.render_texts(texts, chunksize=3)
+        assert len(images) == len(texts)
+        for text, (image, left, top) in zip(texts, images):
+            expected, expected_left, expected_top = render_text(face, text)
+            assert (left, top) == (expected_left, expected_top)
+            assert (image == expected).all()
+
+        indices = list(range(1, 50))
+        glyphs = renderer.render_glyphs(indices)
+        assert [glyph.index for glyph in glyphs] == indices
+        face.load_glyph(36)
+        assert (glyphs[35].bitmap.to_numpy() ==
+                face.glyph.bitmap.to_numpy()).all()
+
+        metrics = renderer.measure_texts(texts)
+        assert [m.advance for m in metrics] == \
+            [face.measure(text).advance for text in texts]
+
+
+def test_process_renderer():
+    numpy = pytest.importorskip("numpy")
+    pytest.importorskip("multiprocessing.shared_memory")
+    from freetype.parallel import ProcessRenderer, SharedCanvas
+    from freetype.text import render_text
+
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(24 * 64)
+    texts = ["Hello", "AVA", "", "World", "wave", "A much longer line"]
+    with open("../examples/VeraMono.ttf", "rb") as f:
+        mono = f.read()
+    with ProcessRenderer(["../examples/Vera.ttf", mono], 24 * 64,
+                         processes=2) as renderer, \
+            SharedCanvas(len(texts) + 1, 32, 100) as canvas:
+        renderer.render_texts(texts, canvas, start=1, chunksize=2)
+        for i, text in enumerate(texts, 1):
+            expected, left, top = render_text(face, text)
+            image, image_left, image_top = canvas.image(i)
+            assert (image_left, image_top) == (left, top)
+            assert (image == expected[:32, :100]).all()
+        assert not canvas.images[0].any()
+        with pytest.raises(ValueError):
+            renderer.render_texts(texts, canvas, start=2)
+        del image
@@ -0,0 +1,72 @@
+import freetype
+import pytest
+
+
+def test_render_text():
+    numpy = pytest.importorskip("numpy")
+    from freetype.cache import GlyphCache
+    from freetype.text import render_text
+
+    face = freetype.Face("../examples/Vera.ttf")
+    face.set_char_size(24 * 64)
+    cache = GlyphCache()
+    image, left, top = render_text(face, "AVA", cache=cache)
+    assert cache.misses == 2 and cache.hits == 0
+
+    # Reference: load and blit each character, the way the examples do
+    expected = numpy.zeros_like(image)
+    pen, previous = 0, 0
+    for char in "AVA":
+        face.load_char(char)
+        pen += face.get_kerning(previous, char).x
+        previous = char
+        bitmap = face.glyph.bitmap.to_numpy()
+        x = (pen >> 6) + face.glyph.bitmap_left - left
+        y = top - face.glyph.bitmap_top
+        region = expected[y:y + bitmap.shape[0], x:x + bitmap.shape[1]]
+        numpy.maximum(region, bitmap, out=region)
+        pen += face.glyph.advance.x
+    assert (image == expected).all()
+
+    assert render_text(face, "AVA", cache=cache)[0].shape == image.shape
+    assert cache.misses == 2
+    assert render_text(face, " ")[0].shape == (0, 0)
+
+
+def test_font_chain():
+    numpy = pytest.importorskip("numpy")
+    from freetype.text import FontChain, render_text
+
+    vera = freetype.Face("../examples/Vera.ttf")
+    mono = freetype.Face("../examples/VeraMono.ttf")
+    for face in (vera, mono):
+        face.set_char_size(24 * 64)
+    # Pretend the first face only covers a few characters
+    vera._coverage = freetype.Coverage.from_codes("AVab")
+    chain = FontChain([vera, mono])
+    runs = [(face is vera, start, stop)
+            for face, start, stop in chain.runs(u"AVxyab\u65e5c")]
+    assert runs == [(True, 0, 2), (False, 2, 4), (True, 4, 7), (False, 7, 8)]
+    assert chain.runs("") == []
+
+    image, left, top = chain.render_text("AVxy")
+    assert chain.cache.misses == 4
+    first, left1, top1 = render_text(vera, "AV")
+    second, left2, top2 = render_text(mono, "xy")
+    expected = numpy.zeros_like(image)
+    for part, x, y in ((first, left1, top1),
+                       (second, left2 + (vera.measure("AV").advance >> 6),
+                        top2)):
+        region = expected[top - y:top - y + part.shape[0],
+                          x - left:x - left + part.shape[1]]
+        numpy.maximum(region, part, out=region)
+    assert (image == expected).all()
+
+    metrics = chain.measure("AVxy")
+    assert metrics.advance == (vera.measure("AV").advance +
+                               mono.measure("xy").advance)
+    assert metrics.bbox.xMin == vera.measure("AV").bbox.xMin
+    many = chain.measure_many(["AVxy", "", "xyAV"])
+    assert [m.advance for m in many] == \
+        [metrics.advance, 0, chain.measure("xyAV").advance]
+    assert many[0].bbox.xMax == metrics.bbox.xMax